@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Batch-render ASMR clips through ComfyUI's API in two passes.
+
+Pass 1 queues every base render (noaudio workflow, saves its latent).
+Pass 2 queues every latent upscale back-to-back, so the upscaler model is
+loaded once for the whole pass instead of once per clip.
+
+Saved latents are tracked in a manifest next to the job file. Re-running
+with a different `upscale` setting (or --upscale-only) reuses them, so
+re-upscaling never re-samples. Upscales already in the manifest are skipped
+too (so a rerun resumes where it stopped); --reupscale redoes them.
+
+Every submitted job is recorded in the run ledger (see run_ledger.py);
+`python scripts/run_ledger.py report` shows throughput and cost.
+
+Job file (JSON list, or {"jobs": [...]}):
+
+    [
+      {"name": "rain-window", "prompt": "Style: ...", "seed": 7,
+       "frames": 65, "width": 768, "height": 448, "fps": 12,
+       "upscale": "spatial+temporal"}
+    ]
+
+Only name and prompt are required; extra fields (e.g. from plan_scenes.py)
+are kept and recorded in the ledger. upscale is one of: spatial, temporal,
+spatial+temporal (or omitted). With temporal, the output frame rate
+defaults to 2x fps — render at 12 fps to get 24 fps out.
+
+Usage:
+    python scripts/batch_generate.py jobs.json [--server HOST:PORT]
+    python scripts/batch_generate.py jobs.json --upscale-only
+    python scripts/batch_generate.py jobs.json --upscale-only --reupscale
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from comfy_api import DEFAULT_SERVER, ComfyClient, output_files, set_input, to_api_prompt
+from generate_workflows import build_latent_upscale, build_t2v_noaudio
+from run_ledger import LEDGER_PATH, RunLedger, gpu_name
+
+JOB_DEFAULTS = {
+    "seed": 42,
+    "frames": 65,
+    "width": 768,
+    "height": 512,
+    "fps": 24,
+    "upscale": None,
+}
+
+# upscale setting -> (spatial, temporal)
+UPSCALE_MODES = {
+    "spatial": (True, False),
+    "temporal": (False, True),
+    "spatial+temporal": (True, True),
+}
+
+# Fields that determine the base render (and therefore its saved latent)
+BASE_FIELDS = ("prompt", "seed", "frames", "width", "height", "fps")
+
+
+def load_jobs(path):
+    """Read and validate a job file; returns jobs with defaults filled in."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data["jobs"]
+
+    jobs = []
+    seen = set()
+    for i, raw in enumerate(data):
+        job = {**JOB_DEFAULTS, **raw}
+        where = f"job {i} ({job.get('name', '?')})"
+        for field in ("name", "prompt"):
+            if not job.get(field):
+                raise ValueError(f"{where}: missing {field!r}")
+        if job["name"] in seen:
+            raise ValueError(f"{where}: duplicate name")
+        seen.add(job["name"])
+        if (job["frames"] - 1) % 8:
+            raise ValueError(f"{where}: frames must be 8n+1, got {job['frames']}")
+        if job["width"] % 64 or job["height"] % 64:
+            raise ValueError(f"{where}: width/height must be divisible by 64")
+        if job["upscale"] is not None and job["upscale"] not in UPSCALE_MODES:
+            raise ValueError(
+                f"{where}: upscale must be one of {', '.join(UPSCALE_MODES)}")
+        jobs.append(job)
+    return jobs
+
+
+def base_key(job):
+    """Hash of everything that affects a job's base latent."""
+    blob = json.dumps({k: job[k] for k in BASE_FIELDS}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def upscale_fps(job):
+    """Output frame rate for the upscale pass (2x for temporal by default)."""
+    if "upscale_fps" in job:
+        return job["upscale_fps"]
+    return job["fps"] * 2 if UPSCALE_MODES[job["upscale"]][1] else job["fps"]
+
+
+def upscale_variant(job):
+    """Ledger variant name for a job's upscale pass, e.g. 'upscale-spatial'."""
+    return "upscale-" + job["upscale"].replace("+", "-")
+
+
+def footage_seconds(job):
+    """New footage a job adds: frames shared with the previous segment
+    (plan_scenes.py overlap_frames) aren't counted twice."""
+    return (job["frames"] - job.get("overlap_frames", 0)) / job["fps"]
+
+
+def output_size(job, variant):
+    """(width, height) of the video a pass produces."""
+    if variant.startswith("upscale") and "spatial" in variant:
+        return job["width"] * 2, job["height"] * 2
+    return job["width"], job["height"]
+
+
+def base_prompt(job):
+    """API prompt for a job's base render (noaudio workflow + saved latent)."""
+    prompt = to_api_prompt(build_t2v_noaudio())
+    set_input(prompt, 10, "value", job["prompt"])
+    set_input(prompt, 17, "noise_seed", job["seed"])
+    set_input(prompt, 30, "width", job["width"])
+    set_input(prompt, 30, "height", job["height"])
+    set_input(prompt, 30, "num_frames", job["frames"])
+    set_input(prompt, 22, "value", float(job["fps"]))
+    set_input(prompt, 32, "filename_prefix", f"latents/{job['name']}")
+    set_input(prompt, 41, "filename_prefix", f"video/{job['name']}")
+    return prompt
+
+
+def upscale_prompt(job, latent):
+    """API prompt that upscales a saved latent (path relative to output/)."""
+    spatial, temporal = UPSCALE_MODES[job["upscale"]]
+    suffix = job["upscale"].replace("+", "-")
+    prompt = to_api_prompt(build_latent_upscale(spatial=spatial, temporal=temporal))
+    set_input(prompt, 24, "latent", f"{latent} [output]")
+    set_input(prompt, 22, "value", float(upscale_fps(job)))
+    set_input(prompt, 32, "filename_prefix", f"latents/{job['name']}-{suffix}")
+    set_input(prompt, 41, "filename_prefix", f"video/{job['name']}-{suffix}")
+    return prompt
+
+
+def load_manifest(path):
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(path, manifest):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _file_path(info):
+    return f"{info['subfolder']}/{info['filename']}" if info.get("subfolder") else info["filename"]
+
+
+def run_pass(client, label, queued, ledger=None, batch_id=None, gpu=None):
+    """Queue every (job, prompt, variant), then wait for all in order.
+
+    Everything is submitted up-front so ComfyUI never sits idle between
+    jobs. Yields (job, history_entry, ok) as prompts finish. A prompt that
+    ComfyUI rejects, or that never finishes (ComfyClient.wait timeout), is
+    yielded with an empty entry and ok=False; the rest of the pass still
+    runs, so the other prompts are awaited and end up in the manifest.
+    """
+    print(f"\n=== {label}: {len(queued)} job(s) ===")
+    pending = []
+    for job, prompt, variant in queued:
+        try:
+            prompt_id = client.queue_prompt(prompt)
+        except RuntimeError as e:
+            print(f"  REJECTED: {job['name']} — {e}")
+            yield job, {}, False
+            continue
+        if ledger:
+            width, height = output_size(job, variant)
+            ledger.record_submit(prompt_id, batch_id, job["name"], variant,
+                                 width, height, footage_seconds(job),
+                                 gpu=gpu, config=job)
+        pending.append((job, prompt_id))
+        print(f"  Queued: {job['name']}")
+    for job, prompt_id in pending:
+        try:
+            entry = client.wait(prompt_id)
+        except TimeoutError as e:
+            print(f"  FAILED: {job['name']} — {e}")
+            yield job, {}, False
+            continue
+        if ledger:
+            ledger.record_result(prompt_id, entry)
+        ok = entry.get("status", {}).get("status_str") != "error"
+        if not ok:
+            print(f"  FAILED: {job['name']} — ComfyUI reported an execution error")
+        yield job, entry, ok
+
+
+def run(jobs, client, manifest, manifest_path, upscale_only=False, force=False,
+        reupscale=False, ledger=None):
+    """Run both passes; returns the number of failed jobs."""
+    failures = 0
+    batch_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    gpu = gpu_name(client.system_stats()) if ledger else None
+    record = {"ledger": ledger, "batch_id": batch_id, "gpu": gpu}
+
+    # --- Pass 1: base renders (skipped when a matching latent exists) ---
+    to_render = []
+    for job in jobs:
+        saved = manifest.get(job["name"])
+        if saved and saved["base_key"] == base_key(job) and not force:
+            continue
+        if upscale_only:
+            print(f"  No saved latent for {job['name']} — skipping")
+            continue
+        to_render.append((job, base_prompt(job), "noaudio"))
+
+    # Jobs with the same prompt (plan_scenes.py share_group) go back-to-back so
+    # ComfyUI's node cache reuses the text encoding instead of redoing it
+    first_seen = {}
+    for job, _, _ in to_render:
+        first_seen.setdefault(job.get("share_group", job["name"]), len(first_seen))
+    to_render.sort(key=lambda q: first_seen[q[0].get("share_group", q[0]["name"])])
+
+    for job, entry, ok in run_pass(client, "Base renders", to_render, **record):
+        if not ok:
+            failures += 1
+            continue
+        latents = output_files(entry, 32, "latents")
+        if not latents:
+            print(f"  FAILED: {job['name']} — finished but saved no latent (node 32 SaveLatent)")
+            failures += 1
+            continue
+        print(f"  Done: {job['name']} -> {_file_path(latents[0])}")
+        manifest[job["name"]] = {
+            "base_key": base_key(job),
+            "latent": _file_path(latents[0]),
+            "upscaled": {},
+        }
+        save_manifest(manifest_path, manifest)
+
+    # --- Pass 2: latent upscales, back-to-back (skipped when already done) ---
+    to_upscale = []
+    for job in jobs:
+        saved = manifest.get(job["name"])
+        if not job["upscale"] or not saved or saved["base_key"] != base_key(job):
+            continue
+        if saved["upscaled"].get(job["upscale"]) and not reupscale:
+            print(f"  Already upscaled: {job['name']} ({job['upscale']})")
+            continue
+        to_upscale.append((job, upscale_prompt(job, saved["latent"]), upscale_variant(job)))
+
+    for job, entry, ok in run_pass(client, "Latent upscales", to_upscale, **record):
+        videos = output_files(entry, 41, "images")
+        if not ok:
+            failures += 1
+            continue
+        print(f"  Done: {job['name']} ({job['upscale']})")
+        manifest[job["name"]]["upscaled"][job["upscale"]] = (
+            _file_path(videos[0]) if videos else None)
+        save_manifest(manifest_path, manifest)
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("jobs", type=Path, help="JSON job file")
+    parser.add_argument("--server", default=DEFAULT_SERVER, help="ComfyUI host:port")
+    parser.add_argument("--manifest", type=Path,
+                        help="latent manifest (default: <jobs>.manifest.json)")
+    parser.add_argument("--upscale-only", action="store_true",
+                        help="only upscale jobs that already have a saved latent")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render base latents even if saved ones match")
+    parser.add_argument("--reupscale", action="store_true",
+                        help="redo upscales already recorded in the manifest")
+    parser.add_argument("--ledger", type=Path, default=LEDGER_PATH,
+                        help="run ledger database (default: runs.sqlite)")
+    parser.add_argument("--no-ledger", action="store_true",
+                        help="don't record runs in the ledger")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    manifest_path = args.manifest or args.jobs.with_suffix(".manifest.json")
+    manifest = load_manifest(manifest_path)
+
+    ledger = None if args.no_ledger else RunLedger(args.ledger)
+    failures = run(jobs, ComfyClient(args.server), manifest, manifest_path,
+                   upscale_only=args.upscale_only, force=args.force,
+                   reupscale=args.reupscale, ledger=ledger)
+    if ledger:
+        ledger.close()
+    print(f"\nDone. {failures} failure(s). Manifest: {manifest_path}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Minimal ComfyUI API helpers for the batch tools.
+
+- to_api_prompt(): convert a UI-format workflow (what generate_workflows.py
+  writes) into the API format that ComfyUI's /prompt endpoint expects.
+- ComfyClient: tiny blocking client for /prompt, /history and /system_stats.
+
+Only the node types listed in WIDGET_NAMES can be converted. The audio
+workflows use UUID subgraph samplers whose definitions live inside ComfyUI,
+so the batch tools drive the noaudio + latent upscale workflows.
+
+Stdlib only — runs anywhere the generator runs.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+DEFAULT_SERVER = "127.0.0.1:8188"
+
+# UI-only widgets (e.g. "control_after_generate") that have no API input
+UI_ONLY = None
+
+# Widget order per node type, as stored in a UI workflow's widgets_values
+WIDGET_NAMES = {
+    "CheckpointLoaderSimple": ["ckpt_name"],
+    "LTXVGemmaCLIPModelLoader": ["gemma_path", "ltxv_path", "max_length"],
+    "LoraLoaderModelOnly": ["lora_name", "strength_model"],
+    "LatentUpscaleModelLoader": ["model_name"],
+    "PrimitiveStringMultiline": ["value"],
+    "PrimitiveFloat": ["value"],
+    "PrimitiveInt": ["value", UI_ONLY],
+    "CM_FloatToInt": ["a"],
+    "CLIPTextEncode": ["text"],
+    "LTXVConditioning": ["frame_rate"],
+    "STGGuiderAdvanced": [
+        "skip_steps_sigma_threshold", "cfg_star_rescale", "sigmas",
+        "cfg_values", "stg_scale_values", "stg_rescale_values",
+        "stg_layers_indices",
+    ],
+    "KSamplerSelect": ["sampler_name"],
+    "BasicScheduler": ["scheduler", "steps", "denoise"],
+    "RandomNoise": ["noise_seed", UI_ONLY],
+    "LTXVBaseSampler": ["width", "height", "num_frames"],
+    "LTXVLatentUpsampler": [],
+    "VAEDecode": [],
+    "LoadLatent": ["latent"],
+    "SaveLatent": ["filename_prefix"],
+    "EmptyImage": ["width", "height", "batch_size", "color"],
+    "CreateVideo": ["fps"],
+    "SaveVideo": ["filename_prefix", "format", "codec"],
+}
+
+# Frontend-only nodes that never reach the server
+VIRTUAL_NODES = {"MarkdownNote", "Note"}
+
+MODE_MUTED = 2
+MODE_BYPASSED = 4
+
+
+def to_api_prompt(workflow):
+    """Convert a UI-format workflow dict into an API-format prompt dict."""
+    nodes = {n["id"]: n for n in workflow["nodes"]}
+    links = {l[0]: l for l in workflow["links"]}
+
+    def resolve(link_id, dtype):
+        """Follow a link back to a live node, skipping bypassed nodes."""
+        _, src_id, src_slot, _, _, _ = links[link_id]
+        src = nodes[src_id]
+        if src.get("mode") == MODE_BYPASSED:
+            # A bypassed node passes through its first input of the same type
+            for inp in src.get("inputs", []):
+                if inp.get("type") == dtype and inp.get("link") is not None:
+                    return resolve(inp["link"], dtype)
+            return None
+        if src.get("mode") == MODE_MUTED:
+            return None
+        return [str(src_id), src_slot]
+
+    prompt = {}
+    for node_id, node in nodes.items():
+        ntype = node["type"]
+        if ntype in VIRTUAL_NODES or node.get("mode") in (MODE_MUTED, MODE_BYPASSED):
+            continue
+        if ntype not in WIDGET_NAMES:
+            raise ValueError(
+                f"No API mapping for node {node_id} ({ntype}); "
+                "add its widget names to WIDGET_NAMES")
+
+        inputs = {}
+        for name, value in zip(WIDGET_NAMES[ntype], node.get("widgets_values", [])):
+            if name is not UI_ONLY:
+                inputs[name] = value
+        for inp in node.get("inputs", []):
+            if inp.get("link") is None:
+                continue
+            src = resolve(inp["link"], inp["type"])
+            if src is not None:
+                inputs[inp.get("widget", {}).get("name", inp["name"])] = src
+
+        entry = {"class_type": ntype, "inputs": inputs}
+        if node.get("title"):
+            entry["_meta"] = {"title": node["title"]}
+        prompt[str(node_id)] = entry
+    return prompt
+
+
+def set_input(prompt, node_id, name, value):
+    """Override one input of an API prompt (node IDs are the builder's IDs)."""
+    node = prompt[str(node_id)]
+    if name not in node["inputs"]:
+        raise KeyError(f"Node {node_id} ({node['class_type']}) has no input {name!r}")
+    node["inputs"][name] = value
+
+
+class ComfyClient:
+    """Blocking ComfyUI HTTP client (one request at a time)."""
+
+    def __init__(self, server=DEFAULT_SERVER, timeout=30):
+        self.base = server if "://" in server else f"http://{server}"
+        self.timeout = timeout
+        self.client_id = str(uuid.uuid4())
+
+    def _request(self, path, payload=None):
+        data = None
+        headers = {}
+        if payload is not None:
+            data = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self.base + path, data=data, headers=headers)
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read() or b"null")
+
+    def queue_prompt(self, prompt):
+        """Submit an API prompt; returns the prompt_id."""
+        try:
+            result = self._request("/prompt", {"prompt": prompt, "client_id": self.client_id})
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"ComfyUI rejected prompt: {e.read().decode(errors='replace')}") from e
+        return result["prompt_id"]
+
+    def history(self, prompt_id):
+        """History entry for prompt_id, or None while it is still queued/running."""
+        return self._request(f"/history/{urllib.parse.quote(prompt_id)}").get(prompt_id)
+
+    def system_stats(self):
+        return self._request("/system_stats")
+
+    def wait(self, prompt_id, poll=1.0, timeout=3600):
+        """Block until prompt_id finishes; returns its history entry.
+
+        Raises TimeoutError after timeout seconds, e.g. when a server restart
+        dropped the prompt from the queue.
+        """
+        # ComfyUI only writes a history entry once the prompt has finished
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self.history(prompt_id)
+            if entry:
+                return entry
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"prompt {prompt_id} not finished after {timeout:g}s")
+            time.sleep(poll)
+
+
+def output_files(entry, node_id, kind):
+    """Files a node produced, e.g. output_files(entry, 32, "latents")."""
+    return entry.get("outputs", {}).get(str(node_id), {}).get(kind, [])
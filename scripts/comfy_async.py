@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Asyncio ComfyUI client for high-volume batch tooling.
+
+- Pooled keep-alive HTTP/1.1 connections (no per-request connect)
+- Backpressure: submissions pause while ComfyUI's /queue is at --max-queue,
+  and at most max_in_flight jobs are awaited at once
+- SaveVideo (and other) outputs stream from /view straight to disk in
+  chunks — a finished video is never held in memory
+- Retries with exponential backoff + full jitter on connection errors,
+  timeouts and 429/5xx responses. POST /prompt is never blindly re-sent
+  after a connection error (ComfyUI doesn't deduplicate prompt_ids, so the
+  job would render twice): the client first looks the prompt_id up in
+  /queue and /history
+
+Stdlib only (asyncio streams), like the rest of scripts/.
+
+    async with AsyncComfyClient("127.0.0.1:8188") as client:
+        results = await asyncio.gather(
+            *(client.run_job(p, "out/") for p in prompts))
+
+See mock_comfy.py for a local mock server and loadtest_comfy.py for a
+load test against it.
+"""
+
+import asyncio
+import json
+import os
+import random
+import urllib.parse
+import uuid
+from pathlib import Path
+
+from comfy_api import DEFAULT_SERVER
+
+CHUNK_SIZE = 64 * 1024
+
+# Responses worth retrying (overloaded / restarting server)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, body=b""):
+        super().__init__(f"HTTP {status}: {body[:200].decode(errors='replace')}")
+        self.status = status
+        self.body = body
+
+
+class LocalWriteError(Exception):
+    """Writing a download to local disk failed (not retried like network errors)."""
+
+
+class ConnectionPool:
+    """Bounded pool of keep-alive connections to one host."""
+
+    def __init__(self, host, port, size=8):
+        self.host = host
+        self.port = port
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0  # connections created (reuse = requests / opened)
+
+    async def acquire(self):
+        await self._slots.acquire()
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        try:
+            conn = await asyncio.open_connection(self.host, self.port)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return conn
+
+    def release(self, conn, reusable):
+        if reusable:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+        self._slots.release()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+async def _read_head(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connection closed by server")
+    version, status = line.decode("latin-1").split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return version, int(status), headers
+
+
+async def _iter_body(reader, headers, timeout):
+    """Yield the response body in chunks (Content-Length, chunked, or to EOF)."""
+    async def read(n):
+        return await asyncio.wait_for(reader.read(n), timeout)
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size_line = await asyncio.wait_for(reader.readline(), timeout)
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                return
+            while size:
+                data = await read(min(CHUNK_SIZE, size))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", size)
+                size -= len(data)
+                yield data
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining:
+            data = await read(min(CHUNK_SIZE, remaining))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(data)
+            yield data
+    else:
+        while data := await read(CHUNK_SIZE):
+            yield data
+
+
+class AsyncComfyClient:
+    """Asyncio ComfyUI client; use as `async with AsyncComfyClient(...)`."""
+
+    def __init__(self, server=DEFAULT_SERVER, pool_size=8, max_in_flight=64,
+                 max_queue=32, timeout=30, retries=4, backoff=0.25,
+                 backoff_cap=10.0, poll=0.5, wait_timeout=3600):
+        host, _, port = urllib.parse.urlsplit(
+            server if "://" in server else f"http://{server}").netloc.partition(":")
+        self.host = host
+        self.pool = ConnectionPool(host, int(port or 80), pool_size)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.poll = poll
+        self.wait_timeout = wait_timeout
+        self.client_id = str(uuid.uuid4())
+        self.requests = 0
+        self.retried = 0
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._submit_lock = asyncio.Lock()
+        self._credit = 0  # submissions allowed before re-checking /queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.pool.close()
+
+    # --- HTTP ---
+
+    async def _request_once(self, method, path, body, sink):
+        conn = await self.pool.acquire()
+        reader, writer = conn
+        reusable = False
+        try:
+            head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                    f"Connection: keep-alive\r\nContent-Length: {len(body)}\r\n")
+            if body:
+                head += "Content-Type: application/json\r\n"
+            writer.write(head.encode("latin-1") + b"\r\n" + body)
+            await writer.drain()
+
+            version, status, headers = await asyncio.wait_for(_read_head(reader), self.timeout)
+            data = []
+            async for chunk in _iter_body(reader, headers, self.timeout):
+                if sink is not None and status == 200:
+                    sink(chunk)
+                else:
+                    data.append(chunk)
+            reusable = (version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close"
+                        and ("content-length" in headers or "transfer-encoding" in headers))
+            return status, b"".join(data)
+        finally:
+            self.requests += 1
+            self.pool.release(conn, reusable)
+
+    def _delay(self, attempt):
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff * 2 ** attempt))
+
+    async def request(self, method, path, payload=None, sink_factory=None,
+                      idempotent=True):
+        """HTTP request with retries. Returns the body (b"" when streamed).
+
+        sink_factory() is called once per attempt and returns a callable that
+        receives each body chunk — so a retried download starts clean.
+        With idempotent=False, connection errors and timeouts are raised
+        instead of retried (the server may already have acted on the request);
+        retryable status codes are still retried.
+        """
+        body = json.dumps(payload).encode() if payload is not None else b""
+        for attempt in range(self.retries + 1):
+            try:
+                sink = sink_factory() if sink_factory else None
+                status, data = await self._request_once(method, path, body, sink)
+            except TRANSIENT_ERRORS as e:
+                if not idempotent:
+                    raise
+                error = e
+            else:
+                if status < 400:
+                    return data
+                error = HTTPError(status, data)
+                if status not in RETRY_STATUSES:
+                    raise error
+            if attempt == self.retries:
+                raise error
+            self.retried += 1
+            await asyncio.sleep(self._delay(attempt))
+
+    async def get_json(self, path):
+        return json.loads(await self.request("GET", path) or b"null")
+
+    # --- ComfyUI API ---
+
+    async def queue_depth(self):
+        queue = await self.get_json("/queue")
+        return len(queue.get("queue_running", [])) + len(queue.get("queue_pending", []))
+
+    async def is_known(self, prompt_id):
+        """True if ComfyUI has prompt_id queued, running or in its history."""
+        queue = await self.get_json("/queue")
+        for item in queue.get("queue_running", []) + queue.get("queue_pending", []):
+            if len(item) > 1 and item[1] == prompt_id:
+                return True
+        return bool(await self.history(prompt_id))
+
+    async def submit(self, prompt):
+        """Queue a prompt once ComfyUI's queue has room; returns the prompt_id.
+
+        The prompt_id is generated here so a submission whose response was
+        lost can be found in /queue or /history. ComfyUI queues a repeated
+        prompt_id again, so after a connection error the POST is only re-sent
+        if the server doesn't have it.
+        """
+        async with self._submit_lock:
+            while self._credit <= 0:
+                self._credit = self.max_queue - await self.queue_depth()
+                if self._credit <= 0:
+                    await asyncio.sleep(self.poll)
+            self._credit -= 1
+            prompt_id = str(uuid.uuid4())
+            payload = {"prompt": prompt, "client_id": self.client_id, "prompt_id": prompt_id}
+            for attempt in range(self.retries + 1):
+                try:
+                    result = json.loads(await self.request(
+                        "POST", "/prompt", payload, idempotent=False))
+                    return result.get("prompt_id", prompt_id)
+                except TRANSIENT_ERRORS:
+                    if await self.is_known(prompt_id):
+                        return prompt_id
+                    if attempt == self.retries:
+                        raise
+                self.retried += 1
+                await asyncio.sleep(self._delay(attempt))
+
+    async def history(self, prompt_id):
+        result = await self.get_json(f"/history/{urllib.parse.quote(prompt_id)}")
+        return (result or {}).get(prompt_id)
+
+    async def wait(self, prompt_id, timeout=None):
+        """Poll until prompt_id has a history entry (i.e. has finished).
+
+        Raises TimeoutError after timeout seconds (default wait_timeout), e.g.
+        when a server restart dropped the prompt from its queue.
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            entry = await self.history(prompt_id)
+            if entry:
+                return entry
+            if asyncio.get_running_loop().time() >= deadline:
+                raise TimeoutError(f"prompt {prompt_id} not finished after {timeout:g}s")
+            await asyncio.sleep(self.poll)
+
+    async def download(self, file_info, dest_dir):
+        """Stream one output file from /view into dest_dir; returns its path.
+
+        Network errors are retried; a failed local write (disk full,
+        permissions) raises LocalWriteError at once. No .part file is left
+        behind on failure.
+        """
+        dest_dir = Path(dest_dir)
+        dest = dest_dir / file_info.get("subfolder", "") / file_info["filename"]
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part = dest.with_name(dest.name + ".part")
+        query = urllib.parse.urlencode({
+            "filename": file_info["filename"],
+            "subfolder": file_info.get("subfolder", ""),
+            "type": file_info.get("type", "output"),
+        })
+
+        handle = None
+
+        def sink_factory():
+            nonlocal handle
+            try:
+                if handle:
+                    handle.close()
+                handle = open(part, "wb")
+            except OSError as e:
+                raise LocalWriteError(f"{part}: {e}") from e
+            return write
+
+        def write(chunk):
+            try:
+                handle.write(chunk)
+            except OSError as e:
+                raise LocalWriteError(f"{part}: {e}") from e
+
+        try:
+            await self.request("GET", f"/view?{query}", sink_factory=sink_factory)
+            handle.close()
+            os.replace(part, dest)
+        except BaseException:
+            if handle:
+                handle.close()
+            part.unlink(missing_ok=True)
+            raise
+        return dest
+
+    async def run_job(self, prompt, dest_dir=None, output_kinds=("images", "gifs", "videos")):
+        """Submit, wait, and stream outputs to dest_dir.
+
+        Returns {"prompt_id", "status", "files"}. At most max_in_flight jobs
+        run at once; the rest wait here without touching the server.
+        """
+        async with self._in_flight:
+            prompt_id = await self.submit(prompt)
+            entry = await self.wait(prompt_id)
+            files = []
+            if dest_dir is not None:
+                for output in entry.get("outputs", {}).values():
+                    for kind in output_kinds:
+                        for info in output.get(kind, []):
+                            if info.get("type", "output") == "output":
+                                files.append(await self.download(info, dest_dir))
+            return {
+                "prompt_id": prompt_id,
+                "status": entry.get("status", {}).get("status_str", "success"),
+                "files": files,
+            }
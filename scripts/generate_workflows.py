@@ -7,18 +7,48 @@ Based on official Lightricks/ComfyUI-LTXVideo example workflows, adapted with:
 - Static camera LoRA pre-wired
 - Audio-aware prompt enhancement system prompts
 - Pre-configured for 768x512 base (upscales to ~1536x1024 with spatial upscaler)
+
+Workflow IDs are derived from the graph content, so regenerating an
+unchanged workflow produces a byte-identical file. Only workflows whose
+structure changed are rewritten (and therefore redeployed by setup-runpod.sh).
+Layout (node positions/sizes, group bounds, canvas view) and link numbering
+are not part of the ID (see workflow_diff.structural_view) — like
+workflow_diff.py, which ignores both by default. A change to only those is
+left on disk unless --layout is given.
+
+Usage:
+    python scripts/generate_workflows.py           # write changed workflows
+    python scripts/generate_workflows.py --diff    # ...and show what changed
+    python scripts/generate_workflows.py --check   # exit 1 if any are stale
+    python scripts/generate_workflows.py --layout  # also write layout-only changes
 """
 
+import argparse
+import functools
 import json
+import sys
 import uuid
 from pathlib import Path
 
+from workflow_diff import diff_workflows, structural_view
+
 WORKFLOWS_DIR = Path(__file__).parent.parent / "workflows"
 
+# Namespace for content-derived workflow IDs (uuid5 of the structural view JSON)
+WORKFLOW_ID_NAMESPACE = uuid.UUID("ce7d7d46-0452-5c25-b5db-15e78b9bd1ab")
+
 # LTX-2 specific UUIDs for ComfyUI v3 sampler nodes
 T2V_SAMPLER_UUID = "61915fab-cab7-41be-9727-d69a7e41f24a"
 I2V_SAMPLER_UUID = "3eaa20c4-5842-4fe4-87df-c0a7e83a6a78"
 
+# Latent upscaler models (downloaded by download-models.sh)
+SPATIAL_UPSCALER = "ltx-2-spatial-upscaler-x2-1.0.safetensors"
+TEMPORAL_UPSCALER = "ltx-2-temporal-upscaler-x2-1.0.safetensors"
+
+# Where the noaudio workflow saves its latents (under ComfyUI's output dir)
+BASE_LATENT_PREFIX = "latents/ASMR-NoAudio"
+UPSCALED_LATENT_PREFIX = "latents/ASMR-Upscaled"
+
 # ASMR prompt enhancer system prompts
 T2V_ENHANCER_SYSTEM = (
     "You are a Creative Assistant specializing in ASMR and ambient video content. "
@@ -154,10 +184,9 @@ class WorkflowBuilder:
         return link_id
 
     def build(self):
-        """Export as ComfyUI-compatible dict."""
+        """Export as ComfyUI-compatible dict with a content-derived ID."""
         max_node_id = max(self.nodes.keys()) if self.nodes else 0
-        return {
-            "id": str(uuid.uuid4()),
+        workflow = {
             "revision": 0,
             "last_node_id": max_node_id,
             "last_link_id": self._link_counter,
@@ -178,6 +207,8 @@ class WorkflowBuilder:
             },
             "version": 0.4,
         }
+        content = json.dumps(structural_view(workflow), sort_keys=True, separators=(",", ":"))
+        return {"id": str(uuid.uuid5(WORKFLOW_ID_NAMESPACE, content)), **workflow}
 
 
 # ---------------------------------------------------------------------------
@@ -214,7 +245,7 @@ def _add_loader_nodes(wb):
         outputs=_output("CLIP", "CLIP"))
 
     wb.add_node(4, "LatentUpscaleModelLoader", [-3200, 570],
-        widgets_values=["ltx-2-spatial-upscaler-x2-1.0.safetensors"],
+        widgets_values=[SPATIAL_UPSCALER],
         size=[400, 58],
         outputs=_output("LATENT_UPSCALE_MODEL", "LATENT_UPSCALE_MODEL"))
 
@@ -534,7 +565,8 @@ def build_i2v():
     return wb.build()
 
 
-def build_t2v_noaudio():
+def build_t2v_noaudio(scheduler="normal", steps=8, skip_steps_sigma_threshold=0.998,
+                      stg_scale="0", stg_rescale="1", stg_layers="[29]", sampler="euler"):
     """Text-to-Video workflow WITHOUT audio — uses LTXVBaseSampler.
 
     Advantages over the UUID sampler version:
@@ -546,6 +578,13 @@ def build_t2v_noaudio():
     Trade-offs:
     - Output is base resolution (768x512), not upscaled
     - No generated audio (layer your own in post)
+
+    The denoised latent is also saved (SaveLatent) so it can be upscaled later
+    with build_latent_upscale() without re-sampling.
+
+    The keyword arguments are the sampler's latency levers (scheduler type,
+    step count, STG guidance); the defaults are the distilled-model settings.
+    sweep_sampler.py varies them to trade steps against quality.
     """
     wb = WorkflowBuilder(
         "ASMR Text-to-Video — No Audio (LTX-2)",
@@ -628,13 +667,13 @@ def build_t2v_noaudio():
     wb.add_node(14, "STGGuiderAdvanced", [-1350, 0],
         title="Guidance (CFG=1 for Distilled)",
         widgets_values=[
-            0.998,      # skip_steps_sigma_threshold
+            skip_steps_sigma_threshold,
             True,       # cfg_star_rescale
             "1.0",      # sigma breakpoints
             "1",        # cfg_values (CFG=1 for distilled)
-            "0",        # stg_scale_values (disabled)
-            "1",        # stg_rescale_values
-            "[29]"      # stg_layers_indices
+            stg_scale,  # stg_scale_values ("0" = disabled)
+            stg_rescale,
+            stg_layers  # stg_layers_indices
         ],
         size=[350, 280],
         inputs=[
@@ -646,14 +685,14 @@ def build_t2v_noaudio():
 
     wb.add_node(15, "KSamplerSelect", [-1350, 340],
         title="Sampler Algorithm",
-        widgets_values=["euler"],
+        widgets_values=[sampler],
         size=[210, 58],
         inputs=[],
         outputs=_output("SAMPLER", "SAMPLER"))
 
     wb.add_node(16, "BasicScheduler", [-1350, 450],
-        title="Scheduler (8 steps for Distilled)",
-        widgets_values=["normal", 8, 1.0],
+        title=f"Scheduler ({steps} steps for Distilled)",
+        widgets_values=[scheduler, steps, 1.0],
         size=[250, 110],
         inputs=[
             {"name": "model", "type": "MODEL", "link": None}
@@ -696,6 +735,13 @@ def build_t2v_noaudio():
         ],
         outputs=_output("IMAGE", "IMAGE"))
 
+    wb.add_node(32, "SaveLatent", [-450, 150],
+        title="Save Latent (for upscale pass)",
+        widgets_values=[BASE_LATENT_PREFIX],
+        size=[270, 58],
+        inputs=[{"name": "samples", "type": "LATENT", "link": None}],
+        outputs=[])
+
     wb.add_node(40, "CreateVideo", [-150, 0],
         widgets_values=[24],
         size=[210, 78],
@@ -723,6 +769,7 @@ def build_t2v_noaudio():
             "- Width/Height: divisible by 64 (default 768x512)\n"
             "- Frames: 8n+1 rule (65=2.7s, 97=4s, 121=5s at 24fps)\n"
             "- Model: FP8 distilled (8 steps, CFG=1)\n"
+            "- Latent is saved to `output/latents/` for the upscale workflows\n"
             "- Click **Run** to generate!"
         ],
         inputs=[], outputs=[])
@@ -766,6 +813,7 @@ def build_t2v_noaudio():
 
     # Latent → decode → video → save
     wb.connect(30, 0, 31, 0, "LATENT")
+    wb.connect(30, 0, 32, 0, "LATENT")
     wb.connect(31, 0, 40, 0, "IMAGE")
     wb.connect(22, 0, 40, 2, "FLOAT")
     wb.connect(40, 0, 41, 0, "VIDEO")
@@ -773,25 +821,227 @@ def build_t2v_noaudio():
     return wb.build()
 
 
-def save_workflow(wf, filename):
-    """Save workflow JSON."""
-    path = WORKFLOWS_DIR / filename
-    with open(path, "w") as f:
-        json.dump(wf, f, indent=2)
-    print(f"  Saved: {path}")
+def build_latent_upscale(spatial=True, temporal=False):
+    """Standalone latent upscale workflow — no sampling.
 
+    Loads a latent saved by the noaudio workflow and runs it through the
+    spatial (2x resolution) and/or temporal (2x frames) latent upscaler,
+    then saves both the upscaled latent and the decoded video. Because the
+    input is a saved latent, a clip can be re-upscaled any number of times
+    without re-sampling it.
+
+    Queue all base renders first and the upscales afterwards: ComfyUI caches
+    the loader nodes between prompts, so the upscaler model is loaded once
+    for the whole upscale pass.
+
+    With temporal=True, render the base clip at half the target frame rate
+    (e.g. 12 fps) and set the output frame rate here to the target (24 fps).
+    """
+    if not (spatial or temporal):
+        raise ValueError("build_latent_upscale needs spatial and/or temporal")
+
+    passes = [name for name, on in (("Spatial", spatial), ("Temporal", temporal)) if on]
+    label = " + ".join(passes)
+    wb = WorkflowBuilder(
+        f"ASMR Latent Upscale — {label} (LTX-2)",
+        "Upscale a saved base-render latent without re-sampling."
+    )
+
+    # --- Loaders ---
+    wb.add_node(1, "CheckpointLoaderSimple", [-3200, 0],
+        title="Checkpoint (VAE only)",
+        widgets_values=["ltx-2-19b-distilled-fp8.safetensors"],
+        size=[400, 100],
+        outputs=[
+            {"name": "MODEL", "type": "MODEL", "links": []},
+            {"name": "CLIP", "type": "CLIP", "links": []},
+            {"name": "VAE", "type": "VAE", "links": []}
+        ])
+
+    if spatial:
+        wb.add_node(4, "LatentUpscaleModelLoader", [-3200, 180],
+            title="Spatial Upscaler (2x resolution)",
+            widgets_values=[SPATIAL_UPSCALER],
+            size=[400, 58],
+            outputs=_output("LATENT_UPSCALE_MODEL", "LATENT_UPSCALE_MODEL"))
+
+    if temporal:
+        wb.add_node(9, "LatentUpscaleModelLoader", [-3200, 300],
+            title="Temporal Upscaler (2x frames)",
+            widgets_values=[TEMPORAL_UPSCALER],
+            size=[400, 58],
+            outputs=_output("LATENT_UPSCALE_MODEL", "LATENT_UPSCALE_MODEL"))
+
+    # --- Input latent ---
+    wb.add_node(24, "LoadLatent", [-2700, 0],
+        title="Base Latent (from output/latents/)",
+        widgets_values=[f"{BASE_LATENT_PREFIX}_00001_.latent [output]"],
+        size=[400, 82],
+        outputs=_output("LATENT", "LATENT"))
+
+    wb.add_node(22, "PrimitiveFloat", [-2700, 150],
+        title="Output Frame Rate (2x base fps if temporal)",
+        widgets_values=[24],
+        size=[300, 58],
+        outputs=_output("FLOAT", "FLOAT"))
+
+    # --- Upscale passes (spatial first: temporal then runs at full res) ---
+    upsampler_inputs = [
+        {"name": "samples", "type": "LATENT", "link": None},
+        {"name": "upscale_model", "type": "LATENT_UPSCALE_MODEL", "link": None},
+        {"name": "vae", "type": "VAE", "link": None}
+    ]
+    if spatial:
+        wb.add_node(33, "LTXVLatentUpsampler", [-2200, 0],
+            title="Spatial Upscale",
+            size=[300, 78],
+            inputs=[dict(i) for i in upsampler_inputs],
+            outputs=_output("LATENT", "LATENT"))
+    if temporal:
+        wb.add_node(34, "LTXVLatentUpsampler", [-1800, 0],
+            title="Temporal Upscale",
+            size=[300, 78],
+            inputs=[dict(i) for i in upsampler_inputs],
+            outputs=_output("LATENT", "LATENT"))
+
+    # --- Decode + Output ---
+    wb.add_node(32, "SaveLatent", [-1400, 150],
+        title="Save Upscaled Latent",
+        widgets_values=[UPSCALED_LATENT_PREFIX],
+        size=[270, 58],
+        inputs=[{"name": "samples", "type": "LATENT", "link": None}],
+        outputs=[])
+
+    wb.add_node(31, "VAEDecode", [-1400, 0],
+        title="Decode Video Latent",
+        size=[210, 78],
+        inputs=[
+            {"name": "samples", "type": "LATENT", "link": None},
+            {"name": "vae", "type": "VAE", "link": None}
+        ],
+        outputs=_output("IMAGE", "IMAGE"))
+
+    wb.add_node(40, "CreateVideo", [-1100, 0],
+        widgets_values=[24],
+        size=[210, 78],
+        inputs=[
+            {"name": "images", "type": "IMAGE", "link": None},
+            {"name": "audio", "type": "AUDIO", "link": None, "shape": 7},
+            {"name": "fps", "type": "FLOAT", "widget": {"name": "fps"}, "link": None}
+        ],
+        outputs=_output("VIDEO", "VIDEO"))
+
+    wb.add_node(41, "SaveVideo", [-800, 0],
+        widgets_values=["video/ASMR-Upscaled", "auto", "auto"],
+        size=[630, 800],
+        inputs=[{"name": "video", "type": "VIDEO", "link": None}],
+        outputs=[])
+
+    # --- Notes ---
+    wb.add_node(50, "MarkdownNote", [-3200, -180],
+        title=f"ASMR Latent Upscale — {label}",
+        size=[600, 150],
+        widgets_values=[
+            f"# ASMR Latent Upscale — {label}\n\n"
+            "Upscales a latent saved by **asmr-txt2vid-noaudio.json** — no re-sampling.\n\n"
+            "- Pick the base latent in **Base Latent** (`... [output]` = ComfyUI output dir)\n"
+            "- Spatial: 2x width/height. Temporal: 2x frames\n"
+            "- Temporal: render the base at 12 fps, set **Output Frame Rate** to 24\n"
+            "- The upscaled latent is saved too, so decoding can be redone cheaply"
+        ],
+        inputs=[], outputs=[])
+
+    # --- Wiring ---
+    latent_src = 24
+    for node_id, model_id, on in ((33, 4, spatial), (34, 9, temporal)):
+        if not on:
+            continue
+        wb.connect(latent_src, 0, node_id, 0, "LATENT")
+        wb.connect(model_id, 0, node_id, 1, "LATENT_UPSCALE_MODEL")
+        wb.connect(1, 2, node_id, 2, "VAE")
+        latent_src = node_id
+
+    wb.connect(latent_src, 0, 32, 0, "LATENT")
+    wb.connect(latent_src, 0, 31, 0, "LATENT")
+    wb.connect(1, 2, 31, 1, "VAE")
+    wb.connect(31, 0, 40, 0, "IMAGE")
+    wb.connect(22, 0, 40, 2, "FLOAT")
+    wb.connect(40, 0, 41, 0, "VIDEO")
+
+    return wb.build()
+
+
+# filename -> builder
+WORKFLOWS = {
+    "asmr-txt2vid.json": build_t2v,
+    "asmr-img2vid.json": build_i2v,
+    "asmr-txt2vid-noaudio.json": build_t2v_noaudio,
+    "asmr-upscale-spatial.json": functools.partial(build_latent_upscale, spatial=True),
+    "asmr-upscale-temporal.json": functools.partial(build_latent_upscale, spatial=False, temporal=True),
+    "asmr-upscale-spatial-temporal.json": functools.partial(build_latent_upscale, spatial=True, temporal=True),
+}
+
+
+def _same_structure(old, new):
+    """True if two workflows differ only in layout or link numbering."""
+    return old.get("id") == new.get("id") and structural_view(old) == structural_view(new)
+
+
+def save_workflow(wf, filename, show_diff=False, dry_run=False, layout=False):
+    """Save workflow JSON if its structure changed (or, with layout=True, any
+    content). Returns True if (re)written."""
+    path = WORKFLOWS_DIR / filename
+    text = json.dumps(wf, indent=2)
+    old = path.read_text() if path.exists() else None
+    if old == text:
+        print(f"  Unchanged: {path}")
+        return False
+    if old is not None and not layout and _same_structure(json.loads(old), wf):
+        print(f"  Unchanged: {path} (layout/numbering differs — pass --layout to rewrite)")
+        return False
+
+    print(f"  {'Stale' if dry_run else 'Saved'}: {path}")
+    if show_diff and old is not None:
+        changes = diff_workflows(json.loads(old), wf, layout=layout)
+        for line in changes or ["(metadata only: groups, node properties or workflow info)"]:
+            print(f"      {line}")
+    if not dry_run:
+        path.write_text(text)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate ASMR ComfyUI workflows")
+    parser.add_argument("--diff", action="store_true",
+                        help="print a structural diff for each changed workflow")
+    parser.add_argument("--check", action="store_true",
+                        help="write nothing; exit 1 if any workflow is out of date")
+    parser.add_argument("--layout", action="store_true",
+                        help="also rewrite workflows whose only changes are layout or link numbering")
+    args = parser.parse_args(argv)
 
-if __name__ == "__main__":
     WORKFLOWS_DIR.mkdir(parents=True, exist_ok=True)
 
     print("Generating ASMR workflows...")
 
-    save_workflow(build_t2v(), "asmr-txt2vid.json")
-    save_workflow(build_i2v(), "asmr-img2vid.json")
-    save_workflow(build_t2v_noaudio(), "asmr-txt2vid-noaudio.json")
+    changed = [
+        filename for filename, build in WORKFLOWS.items()
+        if save_workflow(build(), filename, show_diff=args.diff, dry_run=args.check,
+                         layout=args.layout)
+    ]
+
+    if args.check:
+        print(f"\n{len(changed)} of {len(WORKFLOWS)} workflow(s) out of date.")
+        return 1 if changed else 0
 
-    print("\nDone! Generated 3 workflow files.")
+    print(f"\nDone! {len(changed)} of {len(WORKFLOWS)} workflow files changed.")
     print("\n  asmr-txt2vid.json          — T2V with audio (needs more VRAM)")
     print("  asmr-img2vid.json          — I2V with audio (needs more VRAM)")
     print("  asmr-txt2vid-noaudio.json  — T2V video-only (A40-friendly, fast)")
+    print("  asmr-upscale-*.json        — Upscale saved noaudio latents (spatial/temporal)")
     print("\nFor A40 GPUs, use the noaudio workflow. Layer audio in CapCut.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load test for comfy_async.AsyncComfyClient against the mock server.
+
+Runs --jobs prompts through submit → wait → stream-to-disk with
+--concurrency workers, then reports:
+
+- job rate (jobs/s) and bytes streamed
+- connection reuse (requests per pooled connection) and retries
+- peak server queue depth — the default --exec-time is slow enough for
+  the queue to fill, so this checks backpressure holds it at --max-queue
+- prompts the server executed vs jobs submitted (a re-sent POST /prompt
+  would execute twice)
+- Python heap (tracemalloc) sampled through the run; growth after warm-up
+  above --max-growth-mb fails the test (exit 1)
+
+The mock server runs in a child process so its memory (history, queue)
+doesn't count against the client. Downloaded files are deleted as they
+arrive so disk use stays flat.
+
+Usage:
+    python scripts/loadtest_comfy.py --jobs 2000 --concurrency 64
+    python scripts/loadtest_comfy.py --fail-rate 0.02 --drop-rate 0.01 --drop-after-rate 0.02
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from comfy_async import AsyncComfyClient
+from mock_comfy import serve
+
+SAMPLES = 8
+
+
+async def run(args, address):
+    prompt = {"1": {"class_type": "Mock", "inputs": {}}}
+
+    done = 0
+    failed = 0
+    streamed = 0
+    samples = []
+    next_sample = args.jobs // SAMPLES
+    jobs = iter(range(args.jobs))
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        async with AsyncComfyClient(
+                address, pool_size=args.pool_size, max_in_flight=args.concurrency,
+                max_queue=args.max_queue, poll=args.poll) as client:
+
+            async def worker():
+                nonlocal done, failed, streamed, next_sample
+                for _ in jobs:
+                    try:
+                        result = await client.run_job(prompt, out_dir)
+                    except Exception as e:  # keep the load going; count it
+                        failed += 1
+                        print(f"  job failed: {e}", file=sys.stderr)
+                        continue
+                    for path in result["files"]:
+                        streamed += path.stat().st_size
+                        path.unlink()
+                    done += 1
+                    if done >= next_sample:
+                        samples.append((done, tracemalloc.get_traced_memory()[0]))
+                        next_sample += args.jobs // SAMPLES
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+            tracemalloc.stop()
+
+            requests, opened, retried = client.requests, client.pool.opened, client.retried
+            stats = await client.get_json("/mock/stats")
+
+    # Growth: peak of the later samples vs the first (pool + caches warmed up)
+    growth_mb = (max(b for _, b in samples[1:]) - samples[0][1]) / 2 ** 20 if len(samples) > 1 else 0.0
+    print(f"Jobs:          {done} ok, {failed} failed in {elapsed:.1f}s "
+          f"({done / elapsed:.1f} jobs/s)")
+    print(f"Streamed:      {streamed / 2 ** 20:.1f} MiB to disk")
+    print(f"HTTP:          {requests} requests over {opened} connection(s), {retried} retried")
+    print(f"Server queue:  peak depth {stats['max_depth']} (max_queue {args.max_queue})")
+    print(f"Executed:      {stats['executed']} prompt(s) for {args.jobs} job(s)")
+    print("Heap (KiB):    " + ", ".join(f"{n}:{b // 1024}" for n, b in samples))
+    print(f"Heap growth:   {growth_mb:+.2f} MiB after warm-up (limit {args.max_growth_mb} MiB)")
+
+    ok = (failed == 0 and growth_mb <= args.max_growth_mb
+          and stats["max_depth"] <= args.max_queue and stats["executed"] == args.jobs)
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AsyncComfyClient load test (mock server)")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64, help="max jobs in flight")
+    parser.add_argument("--pool-size", type=int, default=16, help="keep-alive connections")
+    parser.add_argument("--max-queue", type=int, default=32, help="server queue depth limit")
+    parser.add_argument("--poll", type=float, default=0.05, help="history poll interval (s)")
+    parser.add_argument("--exec-time", type=float, default=0.01,
+                        help="mock seconds per prompt (default saturates the queue)")
+    parser.add_argument("--video-size", type=int, default=2 * 1024 * 1024, help="bytes per video")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of dropped connections")
+    parser.add_argument("--drop-after-rate", type=float, default=0.0,
+                        help="fraction of POST /prompt enqueued, then dropped without a reply")
+    parser.add_argument("--max-growth-mb", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, daemon=True, kwargs=dict(
+        ready=ready, exec_time=args.exec_time, video_size=args.video_size,
+        fail_rate=args.fail_rate, drop_rate=args.drop_rate,
+        drop_after_rate=args.drop_after_rate))
+    server.start()
+    try:
+        return asyncio.run(run(args, ready.get(timeout=30)))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
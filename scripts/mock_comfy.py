@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Local mock of the ComfyUI endpoints the batch tools use.
+
+Implements /prompt, /queue, /history/{id}, /view and /system_stats over
+keep-alive HTTP/1.1. Prompts "execute" one at a time for --exec-time
+seconds and produce one SaveVideo output of --video-size bytes, which
+/view streams in chunks (generated on the fly, never buffered whole).
+
+Like ComfyUI, a prompt_id that is POSTed twice is queued (and executed)
+twice.
+
+Fault injection for exercising retries: --fail-rate answers a fraction of
+requests with 503, --drop-rate closes the connection instead of answering,
+and --drop-after-rate enqueues a fraction of POST /prompt requests and then
+closes the connection without a response (a lost reply). GET /mock/stats
+reports connections, requests, executed prompts and peak queue depth.
+
+Only the SaveVideo output is mocked, so it serves comfy_async.py and
+loadtest_comfy.py — not batch_generate.py, which needs saved latents.
+
+Usage:
+    python scripts/mock_comfy.py --port 8188 --drop-after-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import urllib.parse
+import uuid
+from collections import OrderedDict, deque
+
+CHUNK_SIZE = 64 * 1024
+MAX_HISTORY = 10000  # same cap as ComfyUI
+
+
+class MockComfyServer:
+    """In-process mock ComfyUI server; `await start()`, then `await stop()`."""
+
+    def __init__(self, host="127.0.0.1", port=0, exec_time=0.01, video_size=1024 * 1024,
+                 fail_rate=0.0, drop_rate=0.0, drop_after_rate=0.0, seed=0):
+        self.host = host
+        self.port = port
+        self.exec_time = exec_time
+        self.video_size = video_size
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.drop_after_rate = drop_after_rate
+        self.random = random.Random(seed)
+        self.history = OrderedDict()
+        self.pending = deque()  # (prompt_id, prompt); repeated ids queue twice
+        self.running = None
+        self.connections = 0
+        self.requests = 0
+        self.executed = 0
+        self.max_depth = 0
+        self._work = asyncio.Event()
+        self._server = None
+        self._worker = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._worker = asyncio.create_task(self._execute())
+        return self
+
+    async def stop(self):
+        self._worker.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    # --- Fake execution ---
+
+    async def _execute(self):
+        counter = 0
+        while True:
+            if not self.pending:
+                self._work.clear()
+                await self._work.wait()
+                continue
+            prompt_id, _ = self.pending.popleft()
+            self.running = prompt_id
+            started = time.time()
+            await asyncio.sleep(self.exec_time)
+            counter += 1
+            self.executed += 1
+            self.history[prompt_id] = {
+                "prompt": [],
+                "outputs": {"41": {"images": [{
+                    "filename": f"mock_{counter:05d}_.mp4",
+                    "subfolder": "video", "type": "output"}], "animated": [True]}},
+                "status": {
+                    "status_str": "success", "completed": True,
+                    "messages": [
+                        ["execution_start", {"prompt_id": prompt_id, "timestamp": int(started * 1000)}],
+                        ["execution_success", {"prompt_id": prompt_id, "timestamp": int(time.time() * 1000)}],
+                    ]},
+            }
+            while len(self.history) > MAX_HISTORY:
+                self.history.popitem(last=False)
+            self.running = None
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = h.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+
+                roll = self.random.random()
+                if roll < self.drop_rate:
+                    break
+                if roll < self.drop_rate + self.fail_rate:
+                    await self._send_json(writer, {"error": "mock overload"}, 503)
+                    continue
+                if (method == "POST" and urllib.parse.urlsplit(target).path == "/prompt"
+                        and self.random.random() < self.drop_after_rate):
+                    self._enqueue(body)  # queued, but the reply is lost
+                    break
+                await self._route(writer, method, target, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send_json(self, writer, payload, status=200):
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode() + data)
+        await writer.drain()
+
+    async def _stream_video(self, writer, size):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: video/mp4\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n")
+        chunk = b"\0" * CHUNK_SIZE
+        remaining = size
+        while remaining:
+            n = min(CHUNK_SIZE, remaining)
+            writer.write(b"%x\r\n" % n + chunk[:n] + b"\r\n")
+            await writer.drain()
+            remaining -= n
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def _enqueue(self, body):
+        data = json.loads(body or b"{}")
+        prompt_id = data.get("prompt_id") or str(uuid.uuid4())
+        self.pending.append((prompt_id, data.get("prompt")))
+        self.max_depth = max(self.max_depth, len(self.pending) + (self.running is not None))
+        self._work.set()
+        return prompt_id
+
+    async def _route(self, writer, method, target, body):
+        url = urllib.parse.urlsplit(target)
+        path = url.path
+        if method == "POST" and path == "/prompt":
+            prompt_id = self._enqueue(body)
+            await self._send_json(writer, {"prompt_id": prompt_id, "number": len(self.pending)})
+        elif path == "/queue":
+            running = [[0, self.running]] if self.running else []
+            await self._send_json(writer, {
+                "queue_running": running,
+                "queue_pending": [[i, pid] for i, (pid, _) in enumerate(self.pending)]})
+        elif path.startswith("/history/"):
+            prompt_id = urllib.parse.unquote(path[len("/history/"):])
+            entry = self.history.get(prompt_id)
+            await self._send_json(writer, {prompt_id: entry} if entry else {})
+        elif path == "/view":
+            await self._stream_video(writer, self.video_size)
+        elif path == "/system_stats":
+            await self._send_json(writer, {"devices": [{"name": "cuda:0 Mock GPU : native"}]})
+        elif path == "/mock/stats":
+            await self._send_json(writer, {
+                "connections": self.connections, "requests": self.requests,
+                "executed": self.executed, "max_depth": self.max_depth})
+        else:
+            await self._send_json(writer, {"error": f"no route {path}"}, 404)
+
+
+async def _serve(host, port, ready=None, **options):
+    server = await MockComfyServer(host, port, **options).start()
+    if ready is not None:
+        ready.put(server.address)
+    else:
+        print(f"Mock ComfyUI listening on {server.address}")
+    await asyncio.Event().wait()
+
+
+def serve(host="127.0.0.1", port=0, ready=None, **options):
+    """Run the mock until killed (e.g. as a multiprocessing target).
+
+    The bound host:port is put on the `ready` queue once listening.
+    """
+    try:
+        asyncio.run(_serve(host, port, ready, **options))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock ComfyUI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8188)
+    parser.add_argument("--exec-time", type=float, default=0.01, help="seconds per prompt")
+    parser.add_argument("--video-size", type=int, default=1024 * 1024, help="bytes per output video")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections dropped")
+    parser.add_argument("--drop-after-rate", type=float, default=0.0,
+                        help="fraction of POST /prompt enqueued, then dropped without a reply")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, exec_time=args.exec_time, video_size=args.video_size,
+          fail_rate=args.fail_rate, drop_rate=args.drop_rate,
+          drop_after_rate=args.drop_after_rate)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Plan a long ASMR video as a list of continuity-preserving segments.
+
+Takes a concept and a target duration, picks matching scenes from the
+prompt library (prompts/*.txt), and splits the timeline into segments:
+
+- Frame counts follow 8n+1; the last segment is trimmed to fit.
+- Consecutive segments overlap by --overlap frames (crossfade / extend
+  region during assembly), so the timeline has no hard cuts.
+- Each scene runs for --segments-per-scene segments, cycling through a
+  few prompt variations. Segments with identical prompt text get the same
+  share_group: their enhanced prompt and text conditioning can be reused,
+  and batch_generate.py queues them back-to-back so ComfyUI's cache does.
+
+The output is a job file for batch_generate.py (extra fields are kept and
+recorded in the run ledger). --fps is the frame rate of the finished video:
+with a temporal upscale the base segments render at half of it (the
+upscaler doubles frames and frame rate), so frame counts and overlaps are
+in base frames.
+
+Prompt expansion is pluggable. The default "rules" expander is offline and
+deterministic. "openai" calls any OpenAI-compatible chat endpoint (e.g. a
+local Ollama/vLLM server). Pass --expander module:Class for your own.
+
+Usage:
+    python scripts/plan_scenes.py "rainy night, cozy cabin" --duration 3600 -o jobs.json
+    python scripts/batch_generate.py jobs.json
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import urllib.request
+from pathlib import Path
+
+from batch_generate import UPSCALE_MODES
+from generate_workflows import T2V_ENHANCER_SYSTEM
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+STOPWORDS = {
+    "the", "and", "with", "for", "from", "into", "onto", "over", "under",
+    "a", "an", "of", "in", "on", "at", "to", "by", "is", "are", "video",
+    "asmr", "scene", "scenes", "ambient", "hour", "hours", "long",
+}
+
+# Rule-based variations, inserted before the closing camera sentence.
+# The first is the template as written.
+VARIATIONS = [
+    "",
+    "The light shifts gradually, growing a touch warmer and softer.",
+    "Small details drift slowly through the frame while everything else stays still.",
+    "The gentle motion slows for a moment, then settles back into its steady rhythm.",
+    "A faint haze softens the background as the scene continues unchanged.",
+    "Subtle reflections shimmer and fade across the nearest surfaces.",
+]
+
+AUDIO_SENTENCE = re.compile(r"\b(audio|sound|sounds|soundscape)\b", re.IGNORECASE)
+
+
+# ---------------------------------------------------------------------------
+# Template library
+# ---------------------------------------------------------------------------
+
+def load_templates(prompts_dir=PROMPTS_DIR):
+    """Parse prompts/*.txt into [{library, title, text}] in file order.
+
+    Raises ValueError if the directory has no usable "## Title" sections.
+    """
+    templates = []
+    for path in sorted(Path(prompts_dir).glob("*.txt")):
+        library = path.stem.replace("asmr-", "")
+        for section in path.read_text().split("\n## ")[1:]:
+            title, _, body = section.partition("\n")
+            text = " ".join(body.split("---")[0].split())
+            if text:
+                templates.append({"library": library, "title": title.strip(), "text": text})
+    if not templates:
+        raise ValueError(f"no prompt templates in {prompts_dir} "
+                         "(expected *.txt files with '## Title' sections)")
+    return templates
+
+
+def _tokens(text):
+    return {w for w in re.findall(r"[a-z]+", text.lower()) if len(w) > 2 and w not in STOPWORDS}
+
+
+def rank_templates(concept, templates):
+    """Templates ordered by keyword overlap with the concept (ties: file order).
+
+    Library and title matches count double. Falls back to every template
+    when nothing matches.
+    """
+    words = _tokens(concept)
+
+    def score(t):
+        strong = _tokens(t["library"] + " " + t["title"])
+        return 2 * len(words & strong) + len(words & _tokens(t["text"]))
+
+    scored = [(score(t), i, t) for i, t in enumerate(templates)]
+    matched = [s for s in scored if s[0] > 0] or scored
+    return [t for _, _, t in sorted(matched, key=lambda s: (-s[0], s[1]))]
+
+
+# ---------------------------------------------------------------------------
+# Expanders
+# ---------------------------------------------------------------------------
+
+def _sentences(text):
+    return re.split(r"(?<=[.!?])\s+", text.strip())
+
+
+class RuleExpander:
+    """Offline, deterministic expander: template + fixed variation sentences."""
+
+    def __init__(self, strip_audio=True):
+        self.strip_audio = strip_audio
+
+    def variations(self, concept, template, count, seed=0):
+        """`count` prompt variations of template for concept."""
+        sentences = _sentences(template["text"])
+        if self.strip_audio:
+            # The batch pipeline is video-only; audio sentences just add noise
+            sentences = [s for s in sentences if not AUDIO_SENTENCE.search(s)]
+
+        extras = VARIATIONS[1:]
+        random.Random(f"{seed}:{template['title']}").shuffle(extras)
+        prompts = []
+        for extra in ([VARIATIONS[0]] + extras)[:count]:
+            parts = list(sentences)
+            if extra:
+                # Keep a trailing camera sentence last
+                at = len(parts) - 1 if "camera" in parts[-1].lower() else len(parts)
+                parts.insert(at, extra)
+            prompts.append(" ".join(parts))
+        return prompts
+
+
+class OpenAIExpander:
+    """Expands via an OpenAI-compatible /chat/completions endpoint.
+
+    Configured with OPENAI_BASE_URL (default https://api.openai.com/v1),
+    OPENAI_API_KEY and PLANNER_MODEL. Uses the same ASMR system prompt as
+    the workflows' Gemma enhancer.
+    """
+
+    def __init__(self, base_url=None, model=None, api_key=None):
+        self.base_url = (base_url or os.environ.get("OPENAI_BASE_URL")
+                         or "https://api.openai.com/v1").rstrip("/")
+        self.model = model or os.environ.get("PLANNER_MODEL", "gpt-4o-mini")
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY", "")
+
+    def _complete(self, user, seed):
+        payload = {
+            "model": self.model,
+            "temperature": 0,
+            "seed": seed,
+            "messages": [
+                {"role": "system", "content": T2V_ENHANCER_SYSTEM},
+                {"role": "user", "content": user},
+            ],
+        }
+        req = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json",
+                     "Authorization": f"Bearer {self.api_key}"})
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            return json.loads(resp.read())["choices"][0]["message"]["content"].strip()
+
+    def variations(self, concept, template, count, seed=0):
+        return [
+            self._complete(
+                f"Concept: {concept}\nReference scene: {template['text']}\n"
+                f"Write variation {i + 1} of {count} of this scene. Keep the same "
+                "setting, framing and static camera so clips join seamlessly; "
+                "vary only small details of light and motion.",
+                seed + i)
+            for i in range(count)
+        ]
+
+
+EXPANDERS = {
+    "rules": RuleExpander,
+    "openai": OpenAIExpander,
+}
+
+
+def get_expander(name):
+    """Expander by registry name, or 'module:Class' for a custom backend."""
+    if name in EXPANDERS:
+        return EXPANDERS[name]()
+    if ":" in name:
+        module, _, cls = name.partition(":")
+        return getattr(importlib.import_module(module), cls)()
+    raise ValueError(f"Unknown expander {name!r} (use {', '.join(EXPANDERS)} or module:Class)")
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+def round_up_8n1(frames):
+    """Smallest valid LTX-2 frame count (8n+1) >= frames."""
+    return max(9, 8 * math.ceil((frames - 1) / 8) + 1)
+
+
+def segment_frames(total_frames, max_frames, overlap):
+    """Frame count per segment covering total_frames with the given overlap."""
+    if (max_frames - 1) % 8:
+        raise ValueError(f"max frames must be 8n+1, got {max_frames}")
+    if not 0 <= overlap < max_frames - 1:
+        raise ValueError(f"overlap must be in [0, {max_frames - 1}), got {overlap}")
+
+    step = max_frames - overlap
+    count = max(1, math.ceil((total_frames - max_frames) / step) + 1)
+    frames = [max_frames] * count
+    # Trim the last segment to what's left (still 8n+1, still > overlap)
+    remaining = total_frames - (count - 1) * step
+    if count > 1:
+        frames[-1] = min(max_frames, round_up_8n1(max(remaining, overlap + 1)))
+    else:
+        frames[0] = min(max_frames, round_up_8n1(total_frames))
+    return frames
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40] or "plan"
+
+
+def plan(concept, duration, expander=None, templates=None, fps=24, max_frames=121,
+         overlap=16, segments_per_scene=6, variations_per_scene=3, seed=42,
+         width=768, height=448, upscale=None):
+    """Build a segment plan; returns a batch_generate.py job file dict.
+
+    fps is the output frame rate; with a temporal upscale the jobs render at
+    fps / 2 so the doubled output lands on fps.
+    """
+    base_fps = fps
+    if upscale and UPSCALE_MODES[upscale][1]:
+        if fps % 2:
+            raise ValueError(f"temporal upscale doubles the frame rate; fps must be even, got {fps}")
+        base_fps = fps // 2
+    expander = expander or RuleExpander()
+    templates = rank_templates(concept, templates or load_templates())
+    frames = segment_frames(round(duration * base_fps), max_frames, overlap)
+    slug = _slug(concept)
+
+    jobs = []
+    prompts = {}  # scene index -> variations
+    start = 0
+    for i, n_frames in enumerate(frames):
+        scene = i // segments_per_scene
+        template = templates[scene % len(templates)]
+        if scene not in prompts:
+            prompts[scene] = expander.variations(
+                concept, template, variations_per_scene, seed=seed + scene)
+        text = prompts[scene][(i % segments_per_scene) % len(prompts[scene])]
+
+        job = {
+            "name": f"{slug}-{i:03d}",
+            "prompt": text,
+            "seed": seed + i,
+            "frames": n_frames,
+            "width": width,
+            "height": height,
+            "fps": base_fps,
+            "segment": i,
+            "scene": f"{template['library']}/{template['title']}",
+            "start_frame": start,
+            "overlap_frames": overlap if i else 0,
+            # Same text -> same enhanced prompt + conditioning
+            "share_group": hashlib.sha256(text.encode()).hexdigest()[:12],
+        }
+        if upscale:
+            job["upscale"] = upscale
+        jobs.append(job)
+        start += n_frames - overlap
+
+    timeline = start + overlap if jobs else 0
+    return {
+        "concept": concept,
+        "duration": duration,
+        "timeline_seconds": round(timeline / base_fps, 2),
+        "segments": len(jobs),
+        "share_groups": len({j["share_group"] for j in jobs}),
+        "jobs": jobs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan a long video as overlapping segments")
+    parser.add_argument("concept", help="what the video is about")
+    parser.add_argument("--duration", type=float, required=True, help="target length in seconds")
+    parser.add_argument("-o", "--output", type=Path, help="job file to write (default: stdout)")
+    parser.add_argument("--expander", default="rules",
+                        help="rules (default), openai, or module:Class")
+    parser.add_argument("--prompts-dir", type=Path, default=PROMPTS_DIR)
+    parser.add_argument("--fps", type=int, default=24,
+                        help="output frame rate (temporal upscale renders at half)")
+    parser.add_argument("--max-frames", type=int, default=121, help="frames per segment (8n+1)")
+    parser.add_argument("--overlap", type=int, default=16, help="overlap frames between segments")
+    parser.add_argument("--segments-per-scene", type=int, default=6)
+    parser.add_argument("--variations-per-scene", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--width", type=int, default=768)
+    parser.add_argument("--height", type=int, default=448)
+    parser.add_argument("--upscale", choices=list(UPSCALE_MODES))
+    args = parser.parse_args(argv)
+
+    result = plan(
+        args.concept, args.duration,
+        expander=get_expander(args.expander),
+        templates=load_templates(args.prompts_dir),
+        fps=args.fps, max_frames=args.max_frames, overlap=args.overlap,
+        segments_per_scene=args.segments_per_scene,
+        variations_per_scene=args.variations_per_scene,
+        seed=args.seed, width=args.width, height=args.height, upscale=args.upscale)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(text)
+        print(f"Planned {result['segments']} segments "
+              f"({result['timeline_seconds']}s, {result['share_groups']} share groups) "
+              f"-> {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+SQLite run ledger + throughput report for ComfyUI batch renders.
+
+batch_generate.py records every job it submits: config, workflow variant,
+output resolution and duration, GPU type, and ComfyUI's own execution
+timestamps. The report turns that into real numbers for sizing GPU fleets:
+
+- clips/hour and seconds of footage per GPU-hour (a clip is a successful
+  base render; upscales add GPU time but no clips)
+- cost per output minute (GPU $/hr from GPU_PRICES or --price)
+- queue idle time — gaps where the GPU sat waiting between jobs
+
+Busy time is execution start → end as reported by ComfyUI. Billed time is
+the wall-clock span of each batch (first start → last finish), which is
+what the pod actually costs; the difference is idle time. Only ComfyUI's
+timestamps are compared, so a client on another machine with a skewed
+clock doesn't distort the numbers.
+
+Upscale variants re-process footage that a base render already produced,
+so their output seconds are excluded from the footage totals (their GPU
+time still counts). Sweep renders (sweep_sampler.py, variant "sweep") are
+benchmarks and are excluded the same way.
+
+Planned segments (plan_scenes.py) record only the frames they add beyond
+their overlap with the previous segment, so crossfade regions count once.
+
+Usage:
+    python scripts/run_ledger.py report [--db runs.sqlite] [--price 0.50]
+    python scripts/run_ledger.py report --batch <batch_id>
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+LEDGER_PATH = Path(__file__).parent.parent / "runs.sqlite"
+
+# $/hr by GPU model, matched as whole words in the GPU name so "A40" doesn't
+# match "RTX A4000" (README estimates — override with --price)
+GPU_PRICES = {
+    "RTX 4090": 0.50,
+    "A40": 0.44,
+    "A100": 2.00,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    prompt_id      TEXT PRIMARY KEY,
+    batch_id       TEXT NOT NULL,
+    job_name       TEXT NOT NULL,
+    variant        TEXT NOT NULL,
+    width          INTEGER,
+    height         INTEGER,
+    output_seconds REAL,
+    gpu            TEXT,
+    config         TEXT,
+    submitted_at   REAL NOT NULL,
+    started_at     REAL,
+    finished_at    REAL,
+    status         TEXT NOT NULL DEFAULT 'pending'
+)
+"""
+
+# ComfyUI history status messages that end a prompt
+END_EVENTS = ("execution_success", "execution_error", "execution_interrupted")
+
+
+# Variants that don't create deliverable footage: sweep_sampler.py benchmarks
+NON_FOOTAGE_VARIANTS = ("sweep",)
+
+
+def is_footage(variant):
+    """False for upscales (re-process existing footage) and benchmark renders."""
+    return not variant.startswith("upscale") and variant not in NON_FOOTAGE_VARIANTS
+
+
+def gpu_name(system_stats):
+    """GPU name from ComfyUI's /system_stats (e.g. 'NVIDIA GeForce RTX 4090')."""
+    devices = system_stats.get("devices") or []
+    if not devices:
+        return None
+    # "cuda:0 NVIDIA GeForce RTX 4090 : cudaMallocAsync" -> "NVIDIA GeForce RTX 4090"
+    name = devices[0].get("name", "")
+    name = name.split(" : ")[0]
+    if name.startswith("cuda:"):
+        name = name.split(" ", 1)[-1]
+    return name or None
+
+
+def gpu_price(gpu):
+    """GPU_PRICES entry for a GPU name, or None for unknown GPUs."""
+    for key, price in GPU_PRICES.items():
+        if gpu and re.search(rf"\b{re.escape(key)}\b", gpu):
+            return price
+    return None
+
+
+def execution_times(entry):
+    """(started_at, finished_at) in epoch seconds from a history entry."""
+    started = finished = None
+    for event, data in entry.get("status", {}).get("messages", []):
+        ts = data.get("timestamp")
+        if ts is None:
+            continue
+        if event == "execution_start":
+            started = ts / 1000
+        elif event in END_EVENTS:
+            finished = ts / 1000
+    return started, finished
+
+
+class RunLedger:
+    """Append-only record of submitted ComfyUI jobs."""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def record_submit(self, prompt_id, batch_id, job_name, variant, width, height,
+                      output_seconds, gpu=None, config=None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO runs (prompt_id, batch_id, job_name, variant, "
+            "width, height, output_seconds, gpu, config, submitted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (prompt_id, batch_id, job_name, variant, width, height, output_seconds,
+             gpu, json.dumps(config, sort_keys=True), time.time()))
+        self.conn.commit()
+
+    def record_result(self, prompt_id, entry):
+        """Store timings + outcome from a finished prompt's history entry.
+
+        Timestamps missing from the entry stay NULL rather than being filled
+        from this machine's clock; the report skips runs without both.
+        """
+        started, finished = execution_times(entry)
+        status = entry.get("status", {}).get("status_str") or "success"
+        self.conn.execute(
+            "UPDATE runs SET started_at = ?, finished_at = ?, status = ? "
+            "WHERE prompt_id = ?",
+            (started, finished, status, prompt_id))
+        self.conn.commit()
+
+    def runs(self, batch_id=None):
+        query = "SELECT * FROM runs"
+        params = ()
+        if batch_id:
+            query += " WHERE batch_id = ?"
+            params = (batch_id,)
+        return [dict(r) for r in self.conn.execute(query + " ORDER BY submitted_at", params)]
+
+    def close(self):
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def _busy(run):
+    if run["started_at"] is None or run["finished_at"] is None:
+        return 0.0
+    return max(0.0, run["finished_at"] - run["started_at"])
+
+
+def idle_gaps(runs):
+    """Gaps (seconds) between one job finishing and the next starting, per batch."""
+    by_batch = defaultdict(list)
+    for run in runs:
+        if run["started_at"] is not None and run["finished_at"] is not None:
+            by_batch[run["batch_id"]].append(run)
+
+    gaps = []
+    for batch in by_batch.values():
+        batch.sort(key=lambda r: r["started_at"])
+        prev_end = batch[0]["finished_at"]
+        for run in batch[1:]:
+            gap = run["started_at"] - prev_end
+            if gap > 0:
+                gaps.append(gap)
+            prev_end = max(prev_end, run["finished_at"])
+    return gaps
+
+
+def _resolve_price(runs, price):
+    """Explicit price, else the GPU_PRICES entry if every run used one GPU type."""
+    if price is not None:
+        return price
+    prices = {gpu_price(r["gpu"]) for r in runs}
+    return prices.pop() if len(prices) == 1 else None
+
+
+def summarize(runs, price=None):
+    """Throughput stats for a list of runs (all from one group)."""
+    done = [r for r in runs if r["status"] == "success"]
+    busy_h = sum(_busy(r) for r in runs) / 3600
+    clips = [r for r in done if is_footage(r["variant"])]
+    footage = sum(r["output_seconds"] or 0 for r in clips)
+    creates = any(is_footage(r["variant"]) for r in runs)
+
+    price = _resolve_price(runs, price)
+    return {
+        "jobs": len(runs),
+        "ok": len(done),
+        "clips": len(clips),
+        "failed": sum(r["status"] not in ("success", "pending") for r in runs),
+        "busy_hours": busy_h,
+        "footage_s": footage,
+        "clips_per_hour": len(clips) / busy_h if busy_h and creates else None,
+        "footage_s_per_gpu_hour": footage / busy_h if busy_h and footage else None,
+        "cost_per_output_min": price * busy_h / (footage / 60) if price and footage else None,
+    }
+
+
+def _fmt(value, spec=".1f"):
+    return "—" if value is None else format(value, spec)
+
+
+def report(runs, price=None):
+    """Plain-text report: per variant/resolution breakdown + idle time."""
+    if not runs:
+        return "No runs recorded."
+
+    groups = defaultdict(list)
+    for run in runs:
+        groups[(run["variant"], f"{run['width']}x{run['height']}")].append(run)
+
+    lines = [
+        f"{'variant':<26}{'res':>11}{'jobs':>6}{'fail':>6}{'clips/h':>9}"
+        f"{'footage s/GPU-h':>17}{'$/out min':>11}",
+    ]
+    for (variant, res), group in sorted(groups.items()):
+        s = summarize(group, price)
+        lines.append(
+            f"{variant:<26}{res:>11}{s['jobs']:>6}{s['failed']:>6}"
+            f"{_fmt(s['clips_per_hour']):>9}{_fmt(s['footage_s_per_gpu_hour']):>17}"
+            f"{_fmt(s['cost_per_output_min'], '.3f'):>11}")
+
+    # Billed (wall-clock) time per batch vs time spent executing
+    billed_h = 0.0
+    for batch_id in {r["batch_id"] for r in runs}:
+        batch = [r for r in runs if r["batch_id"] == batch_id
+                 and r["started_at"] is not None and r["finished_at"] is not None]
+        if batch:
+            billed_h += (max(r["finished_at"] for r in batch)
+                         - min(r["started_at"] for r in batch)) / 3600
+
+    total = summarize(runs, price)
+    gaps = idle_gaps(runs)
+    idle_s = sum(gaps)
+    price = _resolve_price(runs, price)
+    billed_cost = price * billed_h / (total["footage_s"] / 60) if price and total["footage_s"] else None
+
+    lines += [
+        "",
+        f"Footage:        {total['footage_s']:.1f}s from {total['clips']} clip(s)",
+        f"Busy GPU time:  {total['busy_hours'] * 60:.1f} min",
+        f"Billed time:    {billed_h * 60:.1f} min (wall clock per batch)",
+        f"Queue idle:     {idle_s / 60:.1f} min across {len(gaps)} gap(s)"
+        + (f", longest {max(gaps):.1f}s" if gaps else ""),
+        f"$/output min:   {_fmt(total['cost_per_output_min'], '.3f')} busy, "
+        f"{_fmt(billed_cost, '.3f')} billed"
+        + ("" if price else "  (unknown GPU price — pass --price)"),
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run ledger reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="throughput + cost report")
+    rep.add_argument("--db", type=Path, default=LEDGER_PATH, help="ledger database")
+    rep.add_argument("--price", type=float, help="GPU price in $/hr (overrides GPU_PRICES)")
+    rep.add_argument("--batch", help="only this batch_id")
+    args = parser.parse_args(argv)
+
+    if not args.db.exists():
+        print(f"No ledger at {args.db}", file=sys.stderr)
+        return 1
+    ledger = RunLedger(args.db)
+    print(report(ledger.runs(args.batch), args.price))
+    ledger.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
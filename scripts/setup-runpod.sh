@@ -104,8 +104,20 @@ WORKFLOWS_DST="$COMFYUI_ROOT/custom_nodes/ComfyUI-LTXVideo/example_workflows/asm
 
 if [ -d "$WORKFLOWS_SRC" ]; then
     mkdir -p "$WORKFLOWS_DST"
-    cp "$WORKFLOWS_SRC"/*.json "$WORKFLOWS_DST/" 2>/dev/null || true
-    log "ASMR workflows copied to: $WORKFLOWS_DST"
+    # Only copy workflows whose content changed (IDs are derived from the graph
+    # structure, so unchanged workflows are byte-identical and ComfyUI needn't
+    # reload them)
+    copied=0
+    for wf in "$WORKFLOWS_SRC"/*.json; do
+        [ -e "$wf" ] || continue
+        dst="$WORKFLOWS_DST/$(basename "$wf")"
+        if ! cmp -s "$wf" "$dst"; then
+            cp "$wf" "$dst"
+            info "Updated $(basename "$wf")"
+            copied=$((copied + 1))
+        fi
+    done
+    log "ASMR workflows in $WORKFLOWS_DST ($copied updated)"
 else
     warn "Workflows directory not found at $WORKFLOWS_SRC -- skip copying."
 fi
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Sweep the distilled sampler's latency levers and report the Pareto frontier.
+
+Generates noaudio workflow variants over scheduler type, step count,
+STGGuiderAdvanced skip_steps_sigma_threshold and STG scale / rescale /
+layers (rescale and layers only matter with STG on), renders each
+through a pluggable backend, scores it with a pluggable quality scorer,
+and prints every variant against the baseline (normal / 8 steps / 0.998 /
+STG off) with the time-vs-quality Pareto frontier marked.
+
+Backends (--backend):
+    mock   — offline, deterministic synthetic timings read from the graph
+    comfy  — submits to a ComfyUI server; time = ComfyUI execution time
+
+Scorers (--scorer):
+    mock          — deterministic synthetic score (pairs with --backend mock)
+    command:CMD   — runs `CMD <video path>`, reads a float from stdout
+                    (e.g. a CLIP-score or VMAF script; higher = better)
+
+Either can also be module:Class for your own implementation. A backend has
+render(prompt, variant) -> {"seconds", "files"}; a scorer has
+score(variant, result) -> float.
+
+Timing: one untimed warm-up render runs first, so model loading and text
+encoding aren't charged to the baseline. Each --repeats render uses its own
+seed (seed + n * REPEAT_SEED_STRIDE) because ComfyUI serves an identical
+prompt from its cache in ~0s; quality is scored on the requested seed.
+
+Usage:
+    python scripts/sweep_sampler.py --backend mock
+    python scripts/sweep_sampler.py --backend comfy --server 127.0.0.1:8188 \\
+        --scorer "command:python score_clip.py" --steps 4,6,8 -o sweep.json
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import math
+import random
+import re
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from comfy_api import DEFAULT_SERVER, ComfyClient, output_files, set_input, to_api_prompt
+from generate_workflows import DEFAULT_ASMR_PROMPT_NOAUDIO, build_t2v_noaudio
+from run_ledger import RunLedger, execution_times, gpu_name
+
+# Current build_t2v_noaudio settings — everything is compared against this
+BASELINE = {"scheduler": "normal", "steps": 8, "skip_steps_sigma_threshold": 0.998,
+            "stg_scale": "0", "stg_rescale": "1", "stg_layers": "[29]"}
+
+# Seed offset between repeats of one variant/seed (identical prompts are cached)
+REPEAT_SEED_STRIDE = 1_000_003
+
+DEFAULT_GRID = {
+    "scheduler": ["normal", "beta", "linear_quadratic"],
+    "steps": [4, 5, 6, 7, 8],
+    "skip_steps_sigma_threshold": [0.998, 0.99],
+    "stg_scale": ["0", "0.5"],
+    "stg_rescale": ["1", "0.7"],
+    "stg_layers": ["[29]"],
+}
+
+# Settings that have no effect while STG is off (stg_scale "0")
+STG_ONLY = ("stg_rescale", "stg_layers")
+
+
+def _stg_on(variant):
+    return float(variant["stg_scale"]) != 0
+
+
+def variant_label(variant):
+    label = (f"{variant['scheduler']}/{variant['steps']}st/"
+             f"skip{variant['skip_steps_sigma_threshold']}/stg{variant['stg_scale']}")
+    if _stg_on(variant):
+        label += f"/r{variant['stg_rescale']}/L{variant['stg_layers'].replace(' ', '')}"
+    return label
+
+
+def grid_variants(grid):
+    """Every combination of the grid, baseline first.
+
+    With STG off, rescale/layers are pinned to the baseline values, so
+    combinations that would render identically appear once.
+    """
+    keys = list(grid)
+    variants = []
+    for values in itertools.product(*grid.values()):
+        variant = {**BASELINE, **dict(zip(keys, values))}
+        if not _stg_on(variant):
+            variant.update({k: BASELINE[k] for k in STG_ONLY})
+        if variant not in variants:
+            variants.append(variant)
+    variants.sort(key=lambda v: v != BASELINE)
+    if BASELINE not in variants:
+        variants.insert(0, dict(BASELINE))
+    return variants
+
+
+def variant_prompt(variant, text, seed, width=768, height=512, frames=65):
+    """API prompt for one variant (node IDs from build_t2v_noaudio)."""
+    prompt = to_api_prompt(build_t2v_noaudio(**variant))
+    set_input(prompt, 10, "value", text)
+    set_input(prompt, 17, "noise_seed", seed)
+    set_input(prompt, 30, "width", width)
+    set_input(prompt, 30, "height", height)
+    set_input(prompt, 30, "num_frames", frames)
+    name = re.sub(r"[^\w.-]+", "_", variant_label(variant))
+    set_input(prompt, 41, "filename_prefix", f"sweep/{name}")
+    # The sweep measures sampling; the saved latent is just extra I/O
+    del prompt["32"]
+    return prompt
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class MockBackend:
+    """Synthetic render times, derived from the sampler settings in the graph.
+
+    Cost model: fixed load/decode overhead plus one transformer pass per
+    step, and an extra STG pass on the steps whose sigma is below the skip
+    threshold. Only meant for exercising the harness offline.
+    """
+
+    OVERHEAD = 4.0
+    STEP = 2.5
+
+    def render(self, prompt, variant):
+        steps = prompt["16"]["inputs"]["steps"]
+        guider = prompt["14"]["inputs"]
+        stg_on = float(guider["stg_scale_values"]) != 0
+        # Fraction of steps with sigma above the threshold (guidance skipped)
+        skipped = min(1.0, max(0.0, (1.0 - guider["skip_steps_sigma_threshold"]) * 20))
+        passes = steps * (1 + (1 - skipped) * stg_on)
+        jitter = random.Random(json.dumps(prompt, sort_keys=True)).uniform(-0.1, 0.1)
+        return {"seconds": self.OVERHEAD + self.STEP * passes + jitter, "files": []}
+
+
+class ComfyBackend:
+    """Renders on a ComfyUI server, one variant at a time (no overlap, so
+    timings aren't skewed). Downloads outputs for scoring and records each
+    run in the ledger under variant "sweep"."""
+
+    def __init__(self, server=DEFAULT_SERVER, ledger=None, out_dir=None):
+        self.client = ComfyClient(server)
+        self.ledger = ledger
+        self.gpu = gpu_name(self.client.system_stats())
+        self.out_dir = Path(out_dir or tempfile.mkdtemp(prefix="sweep-"))
+        self.batch_id = f"sweep-{time.strftime('%Y%m%d-%H%M%S')}"
+
+    def render(self, prompt, variant):
+        prompt_id = self.client.queue_prompt(prompt)
+        sampler = prompt["30"]["inputs"]
+        if self.ledger:
+            self.ledger.record_submit(
+                prompt_id, self.batch_id, variant_label(variant), "sweep",
+                sampler["width"], sampler["height"],
+                sampler["num_frames"] / prompt["22"]["inputs"]["value"],
+                gpu=self.gpu, config=variant)
+        entry = self.client.wait(prompt_id)
+        if self.ledger:
+            self.ledger.record_result(prompt_id, entry)
+        if entry.get("status", {}).get("status_str") == "error":
+            raise RuntimeError(f"{variant_label(variant)} failed in ComfyUI")
+
+        started, finished = execution_times(entry)
+        if started is None or finished is None:
+            raise RuntimeError(f"{variant_label(variant)}: ComfyUI history has no execution "
+                               "timestamps (update ComfyUI)")
+        files = [self._download(info) for info in output_files(entry, 41, "images")]
+        return {"seconds": finished - started, "files": files}
+
+    def _download(self, info):
+        params = {k: info.get(k, "") for k in ("filename", "subfolder", "type")}
+        dest = self.out_dir / info["filename"]
+        url = f"{self.client.base}/view?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(url, timeout=self.client.timeout) as resp, open(dest, "wb") as f:
+            while chunk := resp.read(64 * 1024):
+                f.write(chunk)
+        return dest
+
+
+# ---------------------------------------------------------------------------
+# Quality scorers (higher = better)
+# ---------------------------------------------------------------------------
+
+class MockScorer:
+    """Synthetic quality: saturates with steps, small scheduler/STG effects."""
+
+    SCHEDULER_BONUS = {"normal": 0.0, "beta": 0.01, "linear_quadratic": 0.006, "simple": -0.004}
+
+    def score(self, variant, result):
+        quality = 1 - 0.6 * math.exp(-variant["steps"] / 1.6)
+        quality += self.SCHEDULER_BONUS.get(variant["scheduler"], 0.0)
+        if _stg_on(variant):
+            # Rescaling pulls STG's effect back toward the unguided output
+            quality += 0.015 * min(float(variant["stg_scale"]), 1.0) * float(variant["stg_rescale"])
+        quality -= 0.2 * (0.998 - variant["skip_steps_sigma_threshold"])
+        return round(quality, 4)
+
+
+class CommandScorer:
+    """Runs an external scoring command on the first output file."""
+
+    def __init__(self, command):
+        self.command = shlex.split(command)
+
+    def score(self, variant, result):
+        if not result["files"]:
+            raise RuntimeError("command scorer needs an output file (use --backend comfy)")
+        out = subprocess.run(self.command + [str(result["files"][0])],
+                             check=True, capture_output=True, text=True).stdout
+        return float(out.strip().split()[-1])
+
+
+BACKENDS = {"mock": MockBackend, "comfy": ComfyBackend}
+SCORERS = {"mock": MockScorer}
+
+
+def _plugin(name, registry):
+    """Registry entry by name, or 'module:Class' for a custom implementation."""
+    if name in registry:
+        return registry[name]()
+    module, sep, cls = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown plugin {name!r} (use {', '.join(registry)} or module:Class)")
+    return getattr(importlib.import_module(module), cls)()
+
+
+def get_scorer(name):
+    if name.startswith("command:"):
+        return CommandScorer(name[len("command:"):])
+    return _plugin(name, SCORERS)
+
+
+# ---------------------------------------------------------------------------
+# Sweep + report
+# ---------------------------------------------------------------------------
+
+def run_sweep(variants, backend, scorer, text=DEFAULT_ASMR_PROMPT_NOAUDIO, seeds=(42,),
+              repeats=1, warmup=True, **size):
+    """Render + score every variant; median time and mean score per variant.
+
+    Repeat n of a seed renders with seed + n * REPEAT_SEED_STRIDE so it isn't
+    a cache hit; only repeat 0 (the requested seed) is scored.
+    """
+    if warmup:
+        # Untimed: loads models and encodes the prompt. Its seed differs from
+        # every timed render so none of them is served from the cache.
+        seed = max(seeds) + repeats * REPEAT_SEED_STRIDE
+        print(f"  warm-up render ({variant_label(variants[0])}, seed {seed})", file=sys.stderr)
+        backend.render(variant_prompt(variants[0], text, seed, **size), variants[0])
+
+    results = []
+    for i, variant in enumerate(variants, 1):
+        times, scores = [], []
+        for seed in seeds:
+            for n in range(repeats):
+                prompt = variant_prompt(variant, text, seed + n * REPEAT_SEED_STRIDE, **size)
+                result = backend.render(prompt, variant)
+                times.append(result["seconds"])
+                if n == 0:
+                    scores.append(scorer.score(variant, result))
+        record = {
+            "variant": variant,
+            "label": variant_label(variant),
+            "seconds": statistics.median(times),
+            "quality": statistics.fmean(scores),
+        }
+        results.append(record)
+        print(f"  [{i}/{len(variants)}] {record['label']:<54} "
+              f"{record['seconds']:7.2f}s  q={record['quality']:.4f}", file=sys.stderr)
+    return results
+
+
+def pareto_frontier(results):
+    """Results not beaten on both time (lower) and quality (higher)."""
+    frontier = []
+    best_quality = -math.inf
+    for r in sorted(results, key=lambda r: (r["seconds"], -r["quality"])):
+        if r["quality"] > best_quality:
+            frontier.append(r)
+            best_quality = r["quality"]
+    return frontier
+
+
+def recommend(results, tolerance=0.0):
+    """Fastest variant whose quality is within tolerance of the baseline."""
+    baseline = next(r for r in results if r["variant"] == BASELINE)
+    ok = [r for r in results if r["quality"] >= baseline["quality"] - tolerance]
+    return baseline, min(ok, key=lambda r: r["seconds"])
+
+
+def report(results, tolerance=0.0):
+    frontier = {id(r) for r in pareto_frontier(results)}
+    baseline, best = recommend(results, tolerance)
+
+    lines = [f"{'':2}{'variant':<54}{'time s':>9}{'vs base':>9}{'quality':>9}{'Δq':>9}"]
+    for r in sorted(results, key=lambda r: r["seconds"]):
+        speed = (1 - r["seconds"] / baseline["seconds"]) * 100
+        lines.append(
+            f"{'*' if id(r) in frontier else ' ':2}{r['label']:<54}{r['seconds']:>9.2f}"
+            f"{speed:>+8.0f}%{r['quality']:>9.4f}{r['quality'] - baseline['quality']:>+9.4f}")
+    lines += [
+        "",
+        "* = Pareto frontier (nothing else is both faster and better)",
+        f"Baseline:    {baseline['label']} — {baseline['seconds']:.2f}s, q={baseline['quality']:.4f}",
+        f"Recommended: {best['label']} — {best['seconds']:.2f}s "
+        f"({(1 - best['seconds'] / baseline['seconds']) * 100:.0f}% faster), "
+        f"q={best['quality']:.4f} (tolerance {tolerance})",
+    ]
+    return "\n".join(lines)
+
+
+def _csv(cast, sep=","):
+    return lambda text: [cast(v.strip()) for v in text.split(sep)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sampler step/schedule sweep with Pareto report")
+    parser.add_argument("--backend", default="mock", help="mock, comfy, or module:Class")
+    parser.add_argument("--scorer", default="mock", help="mock, command:CMD, or module:Class")
+    parser.add_argument("--server", default=DEFAULT_SERVER, help="ComfyUI host:port (comfy backend)")
+    parser.add_argument("--ledger", type=Path, help="record comfy runs in this run ledger")
+    parser.add_argument("--schedulers", type=_csv(str), default=DEFAULT_GRID["scheduler"])
+    parser.add_argument("--steps", type=_csv(int), default=DEFAULT_GRID["steps"])
+    parser.add_argument("--skip-thresholds", type=_csv(float),
+                        default=DEFAULT_GRID["skip_steps_sigma_threshold"])
+    parser.add_argument("--stg-scales", type=_csv(str), default=DEFAULT_GRID["stg_scale"])
+    parser.add_argument("--stg-rescales", type=_csv(str), default=DEFAULT_GRID["stg_rescale"])
+    parser.add_argument("--stg-layers", type=_csv(str, ";"), default=DEFAULT_GRID["stg_layers"],
+                        help='layer lists separated by ";", e.g. "[29];[14, 29]"')
+    parser.add_argument("--prompt", default=DEFAULT_ASMR_PROMPT_NOAUDIO)
+    parser.add_argument("--seeds", type=_csv(int), default=[42])
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="timed renders per seed, each with a fresh seed (median time)")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="skip the untimed warm-up render")
+    parser.add_argument("--frames", type=int, default=65)
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="quality drop allowed vs baseline for the recommendation")
+    parser.add_argument("-o", "--output", type=Path, help="write raw results JSON here")
+    args = parser.parse_args(argv)
+
+    if args.backend == "comfy":
+        ledger = RunLedger(args.ledger) if args.ledger else None
+        backend = ComfyBackend(args.server, ledger=ledger)
+    else:
+        backend = _plugin(args.backend, BACKENDS)
+    scorer = get_scorer(args.scorer)
+
+    variants = grid_variants({
+        "scheduler": args.schedulers,
+        "steps": args.steps,
+        "skip_steps_sigma_threshold": args.skip_thresholds,
+        "stg_scale": args.stg_scales,
+        "stg_rescale": args.stg_rescales,
+        "stg_layers": args.stg_layers,
+    })
+    print(f"Sweeping {len(variants)} variant(s) on the {args.backend} backend...", file=sys.stderr)
+    results = run_sweep(variants, backend, scorer, text=args.prompt, seeds=args.seeds,
+                        repeats=args.repeats, warmup=not args.no_warmup, frames=args.frames)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    print(report(results, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Structural diff of two ComfyUI UI-format workflows.
+
+Reports nodes added/removed/changed (type, title, mode, widget values) and
+links added/removed. Links are matched by their endpoints, not their IDs,
+so renumbering alone is not a change. Layout (pos/size/order) is ignored
+unless --layout is given.
+
+Usage:
+    python scripts/workflow_diff.py old.json new.json [--layout]
+    python scripts/workflow_diff.py workflows/asmr-txt2vid.json --rev HEAD
+
+Exit code is 1 when the workflows differ (like diff).
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from comfy_api import UI_ONLY, WIDGET_NAMES
+
+LAYOUT_KEYS = ("pos", "size", "order")
+
+
+def _node_label(node):
+    label = f"node {node['id']} {node['type']}"
+    if node.get("title"):
+        label += f" \"{node['title']}\""
+    return label
+
+
+def _link_key(link, nodes):
+    """Endpoint identity of a link, e.g. (30, 0, 31, 'samples', 'LATENT')."""
+    _, src, src_slot, dst, dst_slot, dtype = link
+    dst_inputs = nodes.get(dst, {}).get("inputs", [])
+    dst_name = dst_inputs[dst_slot]["name"] if dst_slot < len(dst_inputs) else dst_slot
+    return (src, src_slot, dst, dst_name, dtype)
+
+
+def structural_view(workflow):
+    """Copy of a workflow without what diff_workflows ignores by default.
+
+    Drops layout (node pos/size/order, group bounds, canvas view) and link
+    numbering: links become sorted endpoint keys, and link IDs, the per-slot
+    link references and last_node_id/last_link_id are removed. Metadata the
+    diff doesn't report (groups, node properties, workflow info) is kept.
+    Workflow IDs are derived from this view.
+    """
+    nodes = {n["id"]: n for n in workflow.get("nodes", [])}
+    view = {k: v for k, v in workflow.items()
+            if k not in ("id", "last_node_id", "last_link_id")}
+    view["nodes"] = [{
+        **{k: v for k, v in n.items() if k not in LAYOUT_KEYS},
+        "inputs": [{k: v for k, v in s.items() if k != "link"} for s in n.get("inputs", [])],
+        "outputs": [{k: v for k, v in s.items() if k != "links"} for s in n.get("outputs", [])],
+    } for n in workflow.get("nodes", [])]
+    view["links"] = sorted((list(_link_key(l, nodes)) for l in workflow.get("links", [])), key=str)
+    view["groups"] = [{k: v for k, v in g.items() if k != "bounding"}
+                      for g in workflow.get("groups", [])]
+    if "extra" in workflow:
+        view["extra"] = {k: v for k, v in workflow["extra"].items() if k != "ds"}
+    return view
+
+
+def _widget_name(node_type, index):
+    names = WIDGET_NAMES.get(node_type, [])
+    if index < len(names) and names[index] is not UI_ONLY:
+        return names[index]
+    return f"widget[{index}]"
+
+
+def _short(value, limit=60):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def diff_workflows(old, new, layout=False):
+    """List of human-readable changes from old to new (empty if equivalent)."""
+    old_nodes = {n["id"]: n for n in old["nodes"]}
+    new_nodes = {n["id"]: n for n in new["nodes"]}
+    changes = []
+
+    for nid in sorted(old_nodes.keys() - new_nodes.keys()):
+        changes.append(f"- {_node_label(old_nodes[nid])}")
+    for nid in sorted(new_nodes.keys() - old_nodes.keys()):
+        changes.append(f"+ {_node_label(new_nodes[nid])}")
+
+    for nid in sorted(old_nodes.keys() & new_nodes.keys()):
+        a, b = old_nodes[nid], new_nodes[nid]
+        label = _node_label(b)
+        for key in ("type", "title", "mode"):
+            if a.get(key) != b.get(key):
+                changes.append(f"~ {label}: {key} {_short(a.get(key))} -> {_short(b.get(key))}")
+
+        wa, wb = a.get("widgets_values") or [], b.get("widgets_values") or []
+        for i in range(max(len(wa), len(wb))):
+            va = wa[i] if i < len(wa) else None
+            vb = wb[i] if i < len(wb) else None
+            if va != vb:
+                changes.append(f"~ {label}: {_widget_name(b['type'], i)} "
+                               f"{_short(va)} -> {_short(vb)}")
+
+        for kind in ("inputs", "outputs"):
+            sa = [(s["name"], s["type"]) for s in a.get(kind, [])]
+            sb = [(s["name"], s["type"]) for s in b.get(kind, [])]
+            if sa != sb:
+                changes.append(f"~ {label}: {kind} {sa} -> {sb}")
+
+        if layout:
+            for key in LAYOUT_KEYS:
+                if a.get(key) != b.get(key):
+                    changes.append(f"~ {label}: {key} {a.get(key)} -> {b.get(key)}")
+
+    old_links = {_link_key(l, old_nodes) for l in old["links"]}
+    new_links = {_link_key(l, new_nodes) for l in new["links"]}
+    for sign, links in (("-", old_links - new_links), ("+", new_links - old_links)):
+        for src, src_slot, dst, dst_name, dtype in sorted(links, key=str):
+            changes.append(f"{sign} link {src}:{src_slot} -> {dst}.{dst_name} ({dtype})")
+
+    return changes
+
+
+def _load(path, rev=None):
+    if rev is None:
+        with open(path) as f:
+            return json.load(f)
+    # Resolve relative to the repo root so `git show REV:path` works from anywhere
+    path = Path(path).resolve()
+    root = Path(subprocess.check_output(
+        ["git", "rev-parse", "--show-toplevel"], cwd=path.parent, text=True).strip())
+    blob = subprocess.check_output(
+        ["git", "show", f"{rev}:{path.relative_to(root).as_posix()}"], cwd=root)
+    return json.loads(blob)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Structural diff of ComfyUI workflows")
+    parser.add_argument("old", help="old workflow JSON (or the file to compare with --rev)")
+    parser.add_argument("new", nargs="?", help="new workflow JSON")
+    parser.add_argument("--rev", help="compare OLD at this git revision against the working tree")
+    parser.add_argument("--layout", action="store_true", help="also report pos/size/order changes")
+    args = parser.parse_args(argv)
+
+    if args.rev:
+        old, new = _load(args.old, args.rev), _load(args.old)
+    elif args.new:
+        old, new = _load(args.old), _load(args.new)
+    else:
+        parser.error("give two files, or one file with --rev")
+
+    changes = diff_workflows(old, new, layout=args.layout)
+    for line in changes:
+        print(line)
+    return 1 if changes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())